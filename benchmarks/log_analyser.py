@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable
+
+from benchmarks.log_generator import generate_log, parse_size
+from robocop_ng.helpers.ryujinx_log_analyser import (
+    LogAnalyser,
+    LogTokenizer,
+    StageTimings,
+    blocklist_fields,
+)
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def measure_stages(log_text: str, repeat: int) -> dict[str, float]:
+    parsed_log = LogTokenizer().tokenize(log_text)
+    timings = {}
+    for _ in range(repeat):
+        stage_timings = StageTimings()
+        LogAnalyser(parsed_log, stage_timings).analyse()
+        for stage, record in stage_timings.stages.items():
+            name = f"LogAnalyser.__{stage}"
+            timings[name] = min(timings.get(name, float("inf")), record["wall_time"])
+    return timings
+
+
+def run_benchmarks(size: int, repeat: int) -> dict[str, float]:
+    log_text = generate_log(size)
+    parsed_log = LogTokenizer().tokenize(log_text)
+    timings = {
+        "LogTokenizer.tokenize": measure(
+            lambda: LogTokenizer().tokenize(log_text), repeat
+        ),
+        "LogTokenizer.tokenize(blocklist_fields)": measure(
+            lambda: LogTokenizer(fields=blocklist_fields).tokenize(log_text), repeat
+        ),
+        "LogAnalyser": measure(lambda: LogAnalyser(log_text), repeat),
+        "LogAnalyser.analyse": measure(
+            lambda: LogAnalyser(parsed_log).analyse(), repeat
+        ),
+        "LogAnalyser.analyse_discord": measure(
+            lambda: LogAnalyser(parsed_log).analyse_discord(True, 0), repeat
+        ),
+        "LogAnalyser.get_app_info": measure(
+            lambda: LogAnalyser.get_app_info(log_text), repeat
+        ),
+        "LogAnalyser.get_filepaths": measure(
+            lambda: LogAnalyser.get_filepaths(log_text), repeat
+        ),
+        "LogAnalyser.get_main_ro_section": measure(
+            lambda: LogAnalyser.get_main_ro_section(log_text), repeat
+        ),
+    }
+    timings.update(measure_stages(log_text, repeat))
+    return timings
+
+
+def find_regressions(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+    min_seconds: float,
+) -> list[str]:
+    regressions = []
+    for size, timings in results.items():
+        for name, timing in timings.items():
+            baseline_timing = baseline.get(size, {}).get(name)
+            if baseline_timing is None:
+                continue
+            # Very short timings are mostly noise, so they're only compared once they're measurable
+            if max(timing, baseline_timing) < min_seconds:
+                continue
+            if timing > baseline_timing * (1 + threshold):
+                regressions.append(
+                    f"{name} @ {size}: {baseline_timing * 1000:.2f}ms -> {timing * 1000:.2f}ms "
+                    f"(+{(timing / baseline_timing - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        nargs="+",
+        default=["100KB", "1MB", "10MB", "100MB"],
+        help="sizes of the generated logs",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "baseline.json"),
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline instead of comparing against it",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="relative slowdown compared to the baseline that counts as a regression",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.001,
+        help="timings below this many seconds are never counted as a regression",
+    )
+
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        results[size] = run_benchmarks(parse_size(size), args.repeat)
+        for name, timing in results[size].items():
+            print(f"{size:>8} {name:<40} {timing * 1000:10.2f}ms")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.isfile(args.baseline):
+        print(f"No baseline found at {args.baseline}, nothing to compare against.")
+        sys.exit(0)
+
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+
+    regressions = find_regressions(results, baseline, args.threshold, args.min_time)
+    if len(regressions) > 0:
+        print("Regressions compared to the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions compared to the baseline.")
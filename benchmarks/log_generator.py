@@ -0,0 +1,236 @@
+import random
+import re
+
+size_pattern = re.compile(r"^([\d.]+)\s*(B|KB|MB|GB)$", re.IGNORECASE)
+size_factors = {"b": 1, "kb": 10**3, "mb": 10**6, "gb": 10**9}
+
+settings = {
+    "EnableDockedMode": ["True", "False"],
+    "ResScale": ["1", "2", "3", "-1"],
+    "ResScaleCustom": ["1", "1.5"],
+    "MaxAnisotropy": ["-1", "2", "16"],
+    "AspectRatio": ["Fixed16x9", "Fixed4x3", "Stretched"],
+    "AudioBackend": ["SDL2", "OpenAl", "SoundIo"],
+    "BackendThreading": ["Auto", "On", "Off"],
+    "DramSize": ["MemoryConfiguration4GiB", "MemoryConfiguration8GiB"],
+    "EnableFsIntegrityChecks": ["True", "False"],
+    "FsGlobalAccessLogMode": ["0", "2"],
+    "GraphicsBackend": ["Vulkan", "OpenGl"],
+    "IgnoreMissingServices": ["False", "True"],
+    "MemoryManagerMode": ["HostMappedUnsafe", "HostMapped", "SoftwarePageTable"],
+    "EnablePtc": ["True", "False"],
+    "EnableShaderCache": ["True", "False"],
+    "EnableTextureRecompression": ["False", "True"],
+    "VSyncMode": ["Switch", "Unbounded", "Custom"],
+    "UseHypervisor": ["True", "False"],
+    "EnableLowPowerPtc": ["False", "True"],
+}
+
+games = [
+    ("Super Mario Odyssey", "0100000000010000", "1.3.0"),
+    ("The Legend of Zelda: Tears of the Kingdom", "0100F2C0115B6000", "1.2.1"),
+    ("Pokémon Scarlet", "0100A3D008C5C000", "3.0.1"),
+    ("Xenoblade Chronicles 3", "010074F013262000", "2.2.0"),
+    ("Animal Crossing: New Horizons", "01006F8002326000", "2.0.6"),
+]
+
+errors = [
+    (
+        "Gpu ShaderCache",
+        "Cache collision found in Ryujinx.Graphics.Gpu.Shader.ShaderCache",
+    ),
+    ("ServiceFs", "ResultFsInvalidIvfcHash"),
+    ("ServiceFs", "ResultFsPermissionDenied (2002-6400)"),
+    ("ServiceFs", "ResultFsTargetNotFound (2002-1002)"),
+    (
+        "ServiceAm",
+        "Ryujinx.HLE.Exceptions.ServiceNotImplementedException: Ryujinx.HLE.HOS.Services.Am.ILibraryAppletAccessor: 70",
+    ),
+    (
+        "Gpu",
+        'Unhandled exception caught: Ryujinx.Graphics.Vulkan.VulkanException: Unexpected API error "ErrorOutOfDeviceMemory"',
+    ),
+    (
+        "Application",
+        "Unhandled exception caught: LibHac.Common.Keys.MissingKeyException: Unable to find key",
+    ),
+    (
+        "Cpu",
+        "Unhandled exception caught: System.NullReferenceException: Object reference not set to an instance of an object.",
+    ),
+]
+
+stub_lines = [
+    "HLE.GuestThread.{thread} ServiceAudio IAudioRenderer: Stubbed. RenderingTimeLimit: {value}",
+    "HLE.GuestThread.{thread} ServiceHid IHidServer: Stubbed. AppletResourceUserId: {value}",
+    "HLE.GuestThread.{thread} ServiceNifm IGeneralService: Stubbed. Result: {value}",
+    "HLE.GuestThread.{thread} ServiceAm ICommonStateGetter: Stubbed. PerformanceMode: {value}",
+]
+
+warning_lines = [
+    "HLE.GuestThread.{thread} ServiceFs FileSystemProxy: Opening C:\\Users\\user\\AppData\\Roaming\\Ryujinx\\bis\\user\\save\\{value:016x}\\0",
+    "HLE.GuestThread.{thread} ServiceFs FileSystemProxy: Opening /home/user/.config/Ryujinx/mods/contents/{value:016x}/romfs",
+    "Gpu Vulkan: Shader {value:016x} took longer than expected to compile",
+]
+
+
+class LogGenerator:
+    """Writes synthetic logs which look like real Ryujinx logs to the analyser."""
+
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+        self.lines = []
+        self.size = 0
+        self.milliseconds = 0
+
+    def __timestamp(self) -> str:
+        self.milliseconds += self.random.randint(0, 250)
+        hours, rest = divmod(self.milliseconds, 3_600_000)
+        minutes, rest = divmod(rest, 60_000)
+        seconds, milliseconds = divmod(rest, 1000)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+    def __add_line(self, line: str):
+        self.lines.append(line)
+        self.size += len(line) + 1
+
+    def __add_entry(self, level: str, message: str):
+        self.__add_line(f"{self.__timestamp()} |{level}| {message}")
+
+    def __add_header(self):
+        self.__add_entry("N", "Application : Ryujinx Version: 1.2.78")
+        self.__add_entry(
+            "N",
+            "Application Print: Operating System: Microsoft Windows 10.0.22631 Build 22631 (X64)",
+        )
+        self.__add_entry(
+            "N",
+            "Application Print: CPU: AMD Ryzen 7 5800X3D 8-Core Processor ; 16 logical",
+        )
+        self.__add_entry(
+            "N", "Application Print: RAM: Total 31.93 GiB ; Available 19.42 GiB"
+        )
+        self.__add_entry(
+            "N",
+            "Application PrintSystemInfo: Logs Enabled: Debug, Stub, Info, Warning, Error, Guest, AccessLog, Trace",
+        )
+        self.__add_entry(
+            "N",
+            "Application PrintSystemInfo: Launch Mode: Custom (C:\\Users\\user\\Desktop\\Ryujinx)",
+        )
+        for setting, values in settings.items():
+            self.__add_entry(
+                "I",
+                f"Configuration LogValueChange: {setting} set to: {self.random.choice(values)}",
+            )
+        self.__add_entry(
+            "I", "HLE.FileSystem LoadSystemTitle: Firmware Version: 18.1.0"
+        )
+        self.__add_entry(
+            "I",
+            "Gpu PrintGpuInformation: NVIDIA GeForce RTX 3070 (Vulkan 1.3.277, Driver 551.86)",
+        )
+        self.__add_entry("I", "Application : UserId: 00000000000000010000000000000000")
+
+    def __add_boot(self):
+        game_name, app_id, game_version = self.random.choice(games)
+        for mod_name in self.random.sample(
+            ["60 FPS", "Dynamic Resolution", "4K", "Disable FXAA"], 2
+        ):
+            self.__add_entry(
+                "I",
+                f"ModLoader CollectMods: Found {self.random.choice(['enabled ', 'disabled '])}"
+                f"mod '{mod_name}' [E:\\Mods\\{app_id}\\{mod_name}]",
+            )
+        self.__add_entry(
+            "I",
+            f"HLE.OsThread.{self.random.randint(1, 9)} Loader LoadNca: Application Loaded: "
+            f"{game_name} v{game_version} [{app_id}] [64-bit]",
+        )
+        self.__add_entry(
+            "I", f"Loader LoadExeFs: Build ids found for application {app_id}:"
+        )
+        for _ in range(self.random.randint(1, 3)):
+            self.__add_line(f"    {self.random.getrandbits(256):064X}")
+        self.__add_entry("I", "Loader LoadExeFs: PrintRoSectionInfo: main:")
+        self.__add_line(f"    Module: {game_name.split(':')[0].lower()}")
+        self.__add_line(
+            "    SDK Libraries: SDK MW+Nintendo+NintendoSDK_nnSdk-16.2.0-Release"
+        )
+        self.__add_line("    SDK MW+Nintendo+NintendoSDK_nn_audio-16.2.0-Release")
+        for cheat_name in self.random.sample(
+            ["Infinite Health", "Moon Jump", "Max Money"], 2
+        ):
+            self.__add_entry(
+                "I", f"TamperMachine InstallCheat: Installing cheat '{cheat_name}'"
+            )
+            if self.random.random() < 0.3:
+                self.__add_entry("E", "TamperMachine Compile: Failed to compile cheat")
+        self.__add_entry(
+            "I",
+            f"Hid Configure: {self.random.choice(['ProController', 'Handheld', 'JoyconPair'])}",
+        )
+
+    def __add_error(self):
+        category, message = self.random.choice(errors)
+        self.__add_entry(
+            "E", f"HLE.GuestThread.{self.random.randint(1, 30)} {category}: {message}"
+        )
+        for _ in range(self.random.randint(0, 12)):
+            self.__add_line(
+                f"   at Ryujinx.HLE.HOS.Services.IpcService.CallCmifMethod(ServiceCtx context) "
+                f"in D:\\a\\Ryujinx\\src\\Ryujinx.HLE\\HOS\\Services\\IpcService.cs:line {self.random.randint(1, 400)}"
+            )
+
+    def __add_body_line(self):
+        roll = self.random.random()
+        thread = self.random.randint(1, 30)
+        value = self.random.getrandbits(64)
+        if roll < 0.01:
+            self.__add_error()
+        elif roll < 0.05:
+            self.__add_entry(
+                "W",
+                self.random.choice(warning_lines).format(thread=thread, value=value),
+            )
+        elif roll < 0.06:
+            self.__add_line("")
+        else:
+            self.__add_entry(
+                "S", self.random.choice(stub_lines).format(thread=thread, value=value)
+            )
+
+    def generate(self, size: int, boots: int = 3) -> str:
+        self.__add_header()
+        boot_sizes = [size * (i + 1) // boots for i in range(boots)]
+        for boot_size in boot_sizes:
+            self.__add_boot()
+            while self.size < boot_size:
+                self.__add_body_line()
+        return "\n".join(self.lines)
+
+
+def parse_size(size: str) -> int:
+    size_match = size_pattern.match(size.strip())
+    if size_match is None:
+        raise ValueError(f"Invalid size: {size}")
+    return int(float(size_match.group(1)) * size_factors[size_match.group(2).lower()])
+
+
+def generate_log(size: int, seed: int = 0, boots: int = 3) -> str:
+    return LogGenerator(seed).generate(size, boots)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("size", type=parse_size, help="size of the log, e.g. 10MB")
+    parser.add_argument("output", type=str)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--boots", type=int, default=3)
+
+    args = parser.parse_args()
+
+    with open(args.output, "w", encoding="UTF-8") as file:
+        file.write(generate_log(args.size, args.seed, args.boots))
@@ -1,8 +1,12 @@
+import asyncio
+import codecs
+import contextlib
+import json
 import logging
+import os
 import re
-from typing import Optional
+from typing import AsyncIterator, Collection, Optional, Any
 
-import aiohttp
 from discord import Colour, Embed, Message, Attachment
 from discord.ext import commands
 from discord.ext.commands import Cog, Context, BucketType
@@ -25,12 +29,48 @@ from robocop_ng.helpers.disabled_ids import (
     remove_disable_id,
 )
 from robocop_ng.helpers.disabled_paths import (
-    is_path_disabled,
+    find_disabled_path,
     get_disabled_paths,
     add_disabled_path,
     remove_disabled_path,
 )
-from robocop_ng.helpers.ryujinx_log_analyser import LogAnalyser, RyujinxVersion
+from robocop_ng.helpers.log_analysis_cache import (
+    LogAnalysisCache,
+    get_blocklist_version,
+)
+from robocop_ng.helpers.log_analysis_pool import (
+    LogAnalysisPool,
+    LogAnalysisPoolFullError,
+    analyse_log,
+    read_log,
+)
+from robocop_ng.helpers.log_analysis_scheduler import LogAnalysisScheduler
+from robocop_ng.helpers.log_analyser_rules import (
+    LogAnalyserRules,
+    load_log_analyser_rules,
+)
+from robocop_ng.helpers.log_analysis_stats import LogAnalysisStats
+from robocop_ng.helpers.log_download_cache import LogDownloadCache
+from robocop_ng.helpers.log_fingerprints import (
+    LogFingerprintIndex,
+    get_log_fingerprint,
+)
+from robocop_ng.helpers.ryujinx_log_analyser import (
+    LogAnalyser,
+    LogTokenizer,
+    LogTooComplexError,
+    ParsedLog,
+    RyujinxVersion,
+    StageTimings,
+    blocklist_fields,
+    homebrew_pattern,
+    log_start_pattern,
+    measure_stage,
+    utf8_continuation_bytes,
+)
+
+# Only logged by the game itself, so they come after its app info
+guest_log_levels = ("|S| ", "|G| ")
 
 logging.basicConfig(
     format="%(asctime)s (%(levelname)s) %(message)s (Line %(lineno)d)",
@@ -54,25 +94,213 @@ class LogFileReader(Cog):
         self.bot_log_allowed_channels = self.bot.config.bot_log_allowed_channels
         self.disallowed_named_roles = ["pirate"]
         self.ryujinx_blue = Colour(0x4A90E2)
-        self.uploaded_log_info = []
 
         self.disallowed_roles = [
             self.bot.config.named_roles[x] for x in self.disallowed_named_roles
         ]
+        self.analysis_pool = LogAnalysisPool(
+            self.bot.config.log_analyser_workers,
+            self.bot.config.log_analyser_timeout,
+            self.bot.config.log_analyser_max_pending_tasks,
+        )
+        self.analysis_cache = LogAnalysisCache(
+            self.bot.config.log_analyser_cache_size,
+            os.path.join(self.bot.state_dir, "log_cache"),
+            self.bot.config.log_analyser_disk_cache_size,
+        )
+        self.analysis_stats = LogAnalysisStats(
+            self.bot.config.log_analyser_stats_window
+        )
+        self.analysis_rules = None
+        self.analysis_rules_version = None
+        self.download_cache = LogDownloadCache(
+            self.bot.config.log_analyser_download_cache_size,
+            self.bot.config.log_analyser_download_cache_ttl,
+        )
+        self.log_fingerprints = LogFingerprintIndex(
+            self.bot.config.log_analyser_duplicate_window,
+            self.bot.config.log_analyser_duplicate_index_size,
+        )
+        self.analysis_scheduler = LogAnalysisScheduler(
+            self.bot.config.log_analyser_max_running,
+            self.bot.config.log_analyser_max_queued,
+            self.bot.config.log_analyser_max_queued_per_user,
+        )
+        self.rejected_log_checks = asyncio.Semaphore(
+            self.bot.config.log_analyser_max_rejected_checks
+        )
+
+    def cog_unload(self):
+        self.analysis_pool.shutdown()
+
+    def get_analysis_rules(self) -> LogAnalyserRules:
+        # The rules file is compiled again whenever it changes, so staff can add rules without a restart
+        rules_version = get_blocklist_version(self.bot)
+        if rules_version != self.analysis_rules_version:
+            self.analysis_rules = load_log_analyser_rules(self.bot)
+            self.analysis_rules_version = rules_version
+        return self.analysis_rules
+
+    @staticmethod
+    def is_log_block_incomplete(log_head: str, header: str) -> bool:
+        header_start = log_head.rfind(header)
+        if header_start < 0:
+            return True
+        # A block ends with the next log entry, everything in between is indented
+        return log_start_pattern.search(log_head, header_start + len(header)) is None
 
     @staticmethod
-    async def download_file(log_url):
-        async with aiohttp.ClientSession() as session:
-            # Grabs first and last few bytes of log file to prevent abuse from large files
-            headers = {"Range": "bytes=0-60000, -6000"}
-            async with session.get(log_url, headers=headers) as response:
-                return await response.text("UTF-8")
+    def is_log_head_incomplete(log_head: str) -> bool:
+        # The app info is logged after the game was loaded, so a long list of mods or build ids can push it out of the head,
+        # the head is only searched for the lines themselves since the log is tokenized in a worker once it's downloaded
+        if "Application Loaded:" not in log_head:
+            # Without a game being loaded, or once the game is running, a bigger head won't have the app info either
+            return "Loader" in log_head and not any(
+                level in log_head for level in guest_log_levels
+            )
+        if homebrew_pattern.search(log_head) is not None:
+            return False
+        return LogFileReader.is_log_block_incomplete(
+            log_head, "Build ids found for "
+        ) or LogFileReader.is_log_block_incomplete(
+            log_head, "PrintRoSectionInfo: main:"
+        )
+
+    async def fetch_range(
+        self, log_url: str, start: int, end: int
+    ) -> AsyncIterator[bytes]:
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+        async with self.bot.aiosession.get(log_url, headers=headers) as response:
+            if response.status != 206 and start > 0:
+                # The server ignored the range, so these aren't the requested bytes
+                return
+            remaining = end - start
+            async for chunk in response.content.iter_any():
+                yield chunk[:remaining]
+                remaining -= len(chunk)
+                if remaining <= 0:
+                    return
+
+    async def fetch_log(
+        self, log_url: str, log_size: int, size_limit: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        head_size = self.bot.config.log_analyser_head_size
+        tail_size = self.bot.config.log_analyser_tail_size
+        max_size = self.bot.config.log_analyser_max_download_size
+        decoder = codecs.getincrementaldecoder("UTF-8")()
+
+        if size_limit is not None and log_size > size_limit:
+            # Only the start is read, a character cut in half at the end is left in the decoder
+            async with contextlib.aclosing(
+                self.fetch_range(log_url, 0, size_limit)
+            ) as chunks:
+                async for chunk in chunks:
+                    yield decoder.decode(chunk)
+            return
+
+        # Small logs are read completely, bigger ones only as far as needed to get the app info and their last lines
+        if log_size <= head_size + tail_size:
+            head_end = log_size
+        else:
+            head_end = head_size
+        max_head_end = max(head_end, min(log_size - tail_size, max_size - tail_size))
+        fetched_size = 0
+        head_parts = []
+        while True:
+            async with contextlib.aclosing(
+                self.fetch_range(log_url, fetched_size, head_end)
+            ) as chunks:
+                async for chunk in chunks:
+                    fetched_size += len(chunk)
+                    head_parts.append(decoder.decode(chunk))
+                    yield head_parts[-1]
+            if fetched_size < head_end or head_end >= max_head_end:
+                break
+            if not self.is_log_head_incomplete("".join(head_parts)):
+                break
+            # Every follow-up request doubles the head, so even a long header only takes a few of them
+            head_end = min(head_end * 2, max_head_end)
+
+        tail_start = max(fetched_size, log_size - tail_size)
+        if tail_start >= log_size:
+            yield decoder.decode(b"", final=True)
+            return
+        if tail_start > fetched_size:
+            # A character cut in half by skipping the middle of the log doesn't make the log invalid
+            decoder.reset()
+            yield "\n"
+        is_first_chunk = tail_start > fetched_size
+        async with contextlib.aclosing(
+            self.fetch_range(log_url, tail_start, log_size)
+        ) as chunks:
+            async for chunk in chunks:
+                if is_first_chunk:
+                    chunk = chunk.lstrip(utf8_continuation_bytes)
+                    is_first_chunk = False
+                yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+    async def download_file(
+        self, log: dict[str, Any], rules: LogAnalyserRules
+    ) -> dict[str, Any]:
+        # The blocklist fields are tokenized as the log arrives, so a blocked log doesn't have to be downloaded completely
+        attachment = log["attachment"]
+        timings = log["timings"]
+        tokenizer = LogTokenizer(
+            cpu_budget=self.bot.config.log_analyser_cpu_budget,
+            rules=rules,
+            fields=blocklist_fields,
+        )
+        log_text_parts = []
+        checked_app_info = None
+        checked_paths = set()
+        async with contextlib.aclosing(
+            self.fetch_log(attachment.url, attachment.size, log["size_limit"])
+        ) as log_texts:
+            async for log_text in log_texts:
+                log_text_parts.append(log_text)
+                with measure_stage(timings, "tokenize_download"):
+                    tokenizer.feed(log_text)
+
+                # A log is blocked as soon as it loaded a blocked game, even if another game was loaded after it
+                app_info = tokenizer.log.get_app_info()
+                if app_info is not None and app_info != checked_app_info:
+                    checked_app_info = app_info
+                    if self.is_game_blocked(tokenizer.log):
+                        return {
+                            "is_game_blocked": True,
+                            "blocked_path": None,
+                            "is_log_valid": True,
+                        }
+                new_paths = tokenizer.log.filepaths - checked_paths
+                if len(new_paths) > 0:
+                    checked_paths.update(new_paths)
+                    blocked_path = find_disabled_path(self.bot, new_paths)
+                    if blocked_path is not None:
+                        return {
+                            "is_game_blocked": False,
+                            "blocked_path": blocked_path,
+                            "is_log_valid": True,
+                        }
+
+        # Encoded from the decoded text, so the bytes never contain a character cut in half where the log was skipped
+        log["download"] = "".join(log_text_parts).encode("UTF-8")
+        with measure_stage(timings, "tokenize_download"):
+            parsed_log = tokenizer.close()
+        if timings is not None:
+            timings.input_size = parsed_log.size
+        verdict = self.check_blocklists(parsed_log, timings)
+        self.analysis_cache.put(
+            self.get_blocklist_verdict_key(log["download"]),
+            get_blocklist_version(self.bot),
+            verdict,
+        )
+        return verdict
 
     @staticmethod
-    def is_log_valid(log_file: str) -> bool:
-        app_info = LogAnalyser.get_app_info(log_file)
-        is_homebrew = LogAnalyser.is_homebrew(log_file)
-        if app_info is None or is_homebrew:
+    def is_log_valid(parsed_log: ParsedLog) -> bool:
+        app_info = parsed_log.get_app_info()
+        if app_info is None or parsed_log.is_homebrew:
             return True
         game_name, app_id, another_app_id, build_ids, main_ro_section = app_info
         if (
@@ -85,8 +313,8 @@ class LogFileReader(Cog):
             return False
         return app_id == another_app_id
 
-    def is_game_blocked(self, log_file: str) -> bool:
-        app_info = LogAnalyser.get_app_info(log_file)
+    def is_game_blocked(self, parsed_log: ParsedLog) -> bool:
+        app_info = parsed_log.get_app_info()
         if app_info is None:
             return False
         game_name, app_id, another_app_id, build_ids, main_ro_section = app_info
@@ -97,16 +325,12 @@ class LogFileReader(Cog):
         for bid in build_ids:
             if is_build_id_disabled(self.bot, bid):
                 return True
-        return is_ro_section_disabled(self.bot, main_ro_section)
-
-    def contains_blocked_paths(self, log_file: str) -> Optional[str]:
-        filepaths = LogAnalyser.get_filepaths(log_file)
-        if filepaths is None:
-            return None
-        for filepath in filepaths:
-            if is_path_disabled(self.bot, filepath):
-                return filepath
-        return None
+        return main_ro_section is not None and is_ro_section_disabled(
+            self.bot, main_ro_section
+        )
+
+    def contains_blocked_paths(self, parsed_log: ParsedLog) -> Optional[str]:
+        return find_disabled_path(self.bot, parsed_log.filepaths)
 
     async def blocked_game_action(self, message: Message) -> Embed:
         warn_command = self.bot.get_command("warn")
@@ -169,7 +393,12 @@ class LogFileReader(Cog):
         await message.delete()
         return embed
 
-    def format_analysed_log(self, author_name: str, analyser: LogAnalyser, analysed_log):
+    def format_analysed_log(
+        self,
+        author_name: str,
+        ryujinx_version: tuple[RyujinxVersion, str],
+        analysed_log: dict[str, Any],
+    ):
         cleaned_game_name = re.sub(
             r"\s\[(64|32)-bit\]$", "", analysed_log["game_info"]["game_name"]
         )
@@ -205,7 +434,7 @@ class LogFileReader(Cog):
             )
         )
 
-        version_type, version = analyser.get_ryujinx_version()
+        version_type, version = ryujinx_version
 
         if version_type == RyujinxVersion.STABLE:
             version = f"[{version}](https://github.com/GreemDev/Ryujinx/releases/tag/{version})"
@@ -220,7 +449,11 @@ class LogFileReader(Cog):
         )
 
         log_embed = Embed(title=f"{cleaned_game_name}", colour=self.ryujinx_blue)
-        log_embed.set_footer(text=f"Log uploaded by {author_name}")
+        footer = f"Log uploaded by {author_name}"
+        skipped_sections = analysed_log.get("skipped_sections")
+        if skipped_sections:
+            footer += f" • Skipped because the analysis took too long: {', '.join(skipped_sections)}"
+        log_embed.set_footer(text=footer)
         log_embed.add_field(
             name="General Info",
             value="\n".join((ryujinx_info, hardware_info)),
@@ -290,16 +523,220 @@ class LogFileReader(Cog):
 
         return log_embed
 
-    async def log_file_read(self, message):
-        attached_log = message.attachments[0]
-        author_name = f"@{message.author.name}"
-        log_file = await self.download_file(attached_log.url)
+    async def get_analysed_log(
+        self,
+        log: dict[str, Any],
+        is_channel_allowed: bool,
+        rules: Optional[LogAnalyserRules] = None,
+    ) -> dict[str, Any]:
+        cache_key = self.analysis_cache.get_key(
+            log["download"], "analysis", is_channel_allowed
+        )
+        blocklist_version = get_blocklist_version(self.bot)
+        analysed_log = self.analysis_cache.get(cache_key, blocklist_version)
+        if analysed_log is not None:
+            if log["timings"] is not None:
+                log["timings"].cached = True
+            return analysed_log
+
+        # The log hasn't been read yet if its blocklist verdict was cached
+        parsed_log = log["parsed_log"]
+        if parsed_log is None:
+            parsed_log = await self.read_downloaded_log(log, rules)
+        timings = log["timings"]
+        async with log["pool_slots"]:
+            analysed_log = await self.analysis_pool.run(
+                analyse_log,
+                parsed_log,
+                is_channel_allowed,
+                self.bot.config.bot_log_allowed_channels["pr-testing"],
+                timings is not None,
+                log["time_budget"],
+                rules,
+            )
+        stage_timings = analysed_log.pop("timings")
+        if timings is not None and stage_timings is not None:
+            timings.update(stage_timings)
+        # Errors can't be stored and partial results shouldn't be, so these logs are analysed again next time
+        if analysed_log["error"] is None and not analysed_log["analysis"].get(
+            "skipped_sections"
+        ):
+            self.analysis_cache.put(cache_key, blocklist_version, analysed_log)
+        return analysed_log
+
+    async def parse_log(
+        self,
+        log_bytes: bytes,
+        timings: Optional[StageTimings] = None,
+        rules: Optional[LogAnalyserRules] = None,
+        fields: Optional[Collection[str]] = None,
+        time_budget: Optional[float] = None,
+    ) -> tuple[ParsedLog, Optional[float]]:
+        result = await self.analysis_pool.run(
+            read_log,
+            log_bytes,
+            self.bot.config.log_analyser_cpu_budget,
+            timings is not None,
+            rules,
+            fields,
+            time_budget,
+        )
+        if timings is not None and result["timings"] is not None:
+            timings.update(result["timings"])
+        return result["parsed_log"], result["time_left"]
+
+    def record_timings(self, message: Message, timings: StageTimings):
+        self.analysis_stats.record(timings, message.jump_url)
+        logging.info(
+            f"Log analysis timings for {message.jump_url}: {json.dumps(timings.to_dict())}"
+        )
 
-        if self.is_game_blocked(log_file):
-            return await self.blocked_game_action(message)
-        blocked_path = self.contains_blocked_paths(log_file)
-        if blocked_path:
-            return await self.blocked_path_action(message, blocked_path)
+    async def read_downloaded_log(
+        self, log: dict[str, Any], rules: LogAnalyserRules
+    ) -> ParsedLog:
+        # Only the time spent reading the log in a worker counts, whatever is left of it goes to the analysis
+        async with log["pool_slots"]:
+            log["parsed_log"], log["time_budget"] = await self.parse_log(
+                log["download"],
+                log["timings"],
+                rules,
+                log["fields"],
+                self.bot.config.log_analyser_deadline,
+            )
+        if log["timings"] is not None:
+            log["timings"].input_size = log["parsed_log"].size
+        return log["parsed_log"]
+
+    def check_blocklists(
+        self, parsed_log: ParsedLog, timings: Optional[StageTimings] = None
+    ) -> dict[str, Any]:
+        with measure_stage(timings, "is_game_blocked"):
+            is_game_blocked = self.is_game_blocked(parsed_log)
+        with measure_stage(timings, "contains_blocked_paths"):
+            blocked_path = self.contains_blocked_paths(parsed_log)
+        with measure_stage(timings, "is_log_valid"):
+            is_log_valid = self.is_log_valid(parsed_log)
+        return {
+            "is_game_blocked": is_game_blocked,
+            "blocked_path": blocked_path,
+            "is_log_valid": is_log_valid,
+        }
+
+    def get_blocklist_verdict_key(self, log_bytes: bytes) -> str:
+        return self.analysis_cache.get_key(log_bytes, "blocklist")
+
+    async def get_blocklist_verdict(
+        self, log: dict[str, Any], rules: LogAnalyserRules
+    ) -> dict[str, Any]:
+        # Repeated logs are looked up before they're read, so they skip tokenizing as well as the checks
+        cache_key = self.get_blocklist_verdict_key(log["download"])
+        blocklist_version = get_blocklist_version(self.bot)
+        verdict = self.analysis_cache.get(cache_key, blocklist_version)
+        if verdict is not None:
+            return verdict
+
+        parsed_log = await self.read_downloaded_log(log, rules)
+        verdict = self.check_blocklists(parsed_log, log["timings"])
+        self.analysis_cache.put(cache_key, blocklist_version, verdict)
+        return verdict
+
+    async def download_log_file(
+        self, log: dict[str, Any], rules: LogAnalyserRules
+    ) -> dict[str, Any]:
+        try:
+            attachment = log["attachment"]
+            log_size = attachment.size
+            if log["size_limit"] is not None:
+                # Cut off downloads are cached under their own size, so they're never taken for the whole log
+                log_size = min(log_size, log["size_limit"])
+            cache_key = self.download_cache.get_key(attachment.id, log_size)
+            log["download"] = self.download_cache.get(cache_key)
+            if log["download"] is not None:
+                log["verdict"] = await self.get_blocklist_verdict(log, rules)
+                return log
+
+            log["verdict"] = await self.download_file(log, rules)
+            # Blocked logs stop downloading early, so there's nothing to keep of them
+            if log["download"] is not None:
+                self.download_cache.put(cache_key, log["download"])
+        except Exception as error:
+            # Errors are reported with the analysis of the log, so they don't hide the other logs
+            log["error"] = error
+        return log
+
+    async def check_downloaded_logs(
+        self, message: Message, logs: list[dict[str, Any]]
+    ) -> Optional[Embed]:
+        for log in logs:
+            if log["error"] is not None:
+                continue
+            if log["verdict"]["is_game_blocked"]:
+                return await self.blocked_game_action(message)
+            if log["verdict"]["blocked_path"]:
+                return await self.blocked_path_action(
+                    message, log["verdict"]["blocked_path"]
+                )
+        return None
+
+    async def log_file_read(
+        self, message: Message, log: dict[str, Any], rules: LogAnalyserRules
+    ) -> Embed:
+        try:
+            embed = await self.read_log_file(message, log, rules)
+            # Avoid duplicate log file analysis, at least temporarily; remember the logs analysed recently
+            # this should help support channels not be flooded with too many log files
+            # Other text files can only be analysed on request, so they aren't looked for as duplicates
+            _, is_ryujinx_log_file = self.is_valid_log_name(log["attachment"])
+            if is_ryujinx_log_file:
+                self.log_fingerprints.add(log["fingerprint"], message.jump_url)
+            return embed
+        except LogTooComplexError:
+            embed = Embed(
+                colour=self.ryujinx_blue,
+                description="This log file is too complex to analyse.",
+            )
+            embed.set_footer(text=f"Log uploaded by @{message.author.name}")
+            return embed
+        except LogAnalysisPoolFullError:
+            embed = Embed(
+                colour=self.ryujinx_blue,
+                description="Too many logs are being analysed right now. Please try again in a few minutes.",
+            )
+            embed.set_footer(text=f"Log uploaded by @{message.author.name}")
+            return embed
+        except asyncio.TimeoutError:
+            # Reading and analysing the log both run in the analysis pool, either of them can time out
+            embed = Embed(
+                colour=self.ryujinx_blue,
+                description="This log file took too long to analyse.",
+            )
+            embed.set_footer(text=f"Log uploaded by @{message.author.name}")
+            return embed
+        except UnicodeDecodeError as error:
+            logging.warning(error)
+            return Embed(
+                description="This log file appears to be invalid. Please re-check and re-upload your log file.",
+                colour=self.ryujinx_blue,
+            )
+        except Exception as error:
+            logging.warning(error)
+            error_message = str(error)
+            if error_message != "":
+                error_message = ":\n\n" + error_message
+            return Embed(
+                description=f"Error: Couldn't parse log; parser threw `{type(error).__name__}` exception{error_message}",
+                colour=self.ryujinx_blue,
+            )
+        finally:
+            if log["timings"] is not None:
+                self.record_timings(message, log["timings"])
+
+    async def read_log_file(
+        self, message: Message, log: dict[str, Any], rules: LogAnalyserRules
+    ) -> Embed:
+        if log["error"] is not None:
+            raise log["error"]
+        author_name = f"@{message.author.name}"
 
         for role in message.author.roles:
             if role.id in self.disallowed_roles:
@@ -310,7 +747,7 @@ class LogFileReader(Cog):
                 embed.set_footer(text=f"Log uploaded by {author_name}")
                 return embed
 
-        if not self.is_log_valid(log_file):
+        if not log["verdict"]["is_log_valid"]:
             embed = Embed(
                 title="⚠️ Modified log detected ⚠️",
                 colour=Colour(0xFCFC00),
@@ -319,27 +756,24 @@ class LogFileReader(Cog):
             embed.set_footer(text=f"Log uploaded by {author_name}")
             return embed
 
-        try:
-            analyser = LogAnalyser(log_file)
-        except ValueError:
-            return Embed(
-                colour=self.ryujinx_blue,
-                description="This log file appears to be invalid. Please make sure to upload a Ryujinx log file.",
-            )
-
         is_channel_allowed = False
         for allowed_channel_id in self.bot.config.bot_log_allowed_channels.values():
             if message.channel.id == allowed_channel_id:
                 is_channel_allowed = True
                 break
 
+        result = await self.get_analysed_log(log, is_channel_allowed, rules)
+
+        if isinstance(result["error"], ValueError):
+            return Embed(
+                colour=self.ryujinx_blue,
+                description="This log file appears to be invalid. Please make sure to upload a Ryujinx log file.",
+            )
+        elif result["error"] is not None:
+            raise result["error"]
+
         return self.format_analysed_log(
-            author_name,
-            analyser,
-            analyser.analyse_discord(
-                is_channel_allowed,
-                self.bot.config.bot_log_allowed_channels["pr-testing"],
-            ),
+            author_name, result["ryujinx_version"], result["analysis"]
         )
 
     @commands.check(check_if_staff)
@@ -562,91 +996,258 @@ class LogFileReader(Cog):
         for msg in messages:
             await ctx.send(msg)
 
-    async def analyse_log_message(self, message: Message, attachment_index=0):
+    @commands.check(check_if_staff)
+    @commands.command(aliases=["logstats", "log_analysis_stats", "analysis_stats"])
+    async def log_stats(self, ctx: Context):
+        if len(self.analysis_stats) == 0:
+            if not self.bot.config.log_analyser_profiling:
+                return await ctx.send("Log analysis profiling is disabled.")
+            return await ctx.send("No log analysis timings have been recorded yet.")
+
+        message = f"**Log analysis timings of the last {len(self.analysis_stats)} logs in ms:**\n"
+        message += "```\n"
+        message += (
+            f"{'Stage':<24}{'Count':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'CPU p95':>9}\n"
+        )
+        for stage, percentiles in self.analysis_stats.get_percentiles().items():
+            message += (
+                f"{stage:<24}{percentiles['count']:>6}"
+                f"{percentiles['wall_p50'] * 1000:>9.1f}"
+                f"{percentiles['wall_p95'] * 1000:>9.1f}"
+                f"{percentiles['wall_p99'] * 1000:>9.1f}"
+                f"{percentiles['cpu_p95'] * 1000:>9.1f}\n"
+            )
+        message += "```\n"
+        message += "**Slowest logs:**\n"
+        for total_time, log_link in self.analysis_stats.get_slowest_logs():
+            message += f"- {log_link}: {total_time * 1000:.1f}ms\n"
+        message += (
+            f"Cached analyses, not included above: {self.analysis_stats.cache_hits}\n"
+        )
+        return await ctx.send(message)
+
+    @staticmethod
+    def group_embeds(embeds: list[Embed]) -> list[list[Embed]]:
+        # A message can hold 10 embeds with 6000 characters between them
+        embed_groups = [[]]
+        group_size = 0
+        for embed in embeds:
+            if len(embed_groups[-1]) > 0 and (
+                len(embed_groups[-1]) == 10 or group_size + len(embed) > 6000
+            ):
+                embed_groups.append([])
+                group_size = 0
+            embed_groups[-1].append(embed)
+            group_size += len(embed)
+        return embed_groups
+
+    @staticmethod
+    def new_log(
+        attachment: Attachment,
+        pool_slots: asyncio.Semaphore,
+        profile: bool,
+        fields: Optional[Collection[str]] = None,
+        size_limit: Optional[int] = None,
+    ) -> dict[str, Any]:
+        return {
+            "attachment": attachment,
+            "pool_slots": pool_slots,
+            "timings": StageTimings() if profile else None,
+            "fields": fields,
+            "size_limit": size_limit,
+            "time_budget": None,
+            "download": None,
+            "parsed_log": None,
+            "verdict": None,
+            "fingerprint": None,
+            "error": None,
+        }
+
+    async def analyse_log_message(
+        self,
+        message: Message,
+        attachments: list[Attachment],
+        checked_attachments: list[Attachment] = (),
+    ):
         author_id = message.author.id
         author_mention = message.author.mention
-        filename = message.attachments[attachment_index].filename
-        filesize = message.attachments[attachment_index].size
         # Any message over 2000 chars is uploaded as message.txt, so this is accounted for
         log_file_link = message.jump_url
 
-        uploaded_logs_exist = [
-            True for elem in self.uploaded_log_info if filename in elem.values()
+        # All logs of a message are read together, so they wait in the queue as one
+        ticket = None
+        if len(attachments) + len(checked_attachments) > 0:
+            ticket = self.analysis_scheduler.enqueue(message.channel.id, author_id)
+            if ticket is None:
+                # Logs are still checked against the blocklists without waiting, only their analysis is turned away
+                logging.warning(
+                    f"Skipped analysing the logs of {log_file_link}, the log analysis queue is full."
+                )
+
+        # A message only gets its share of the analysis pool, so its attachments can't fill the pool by themselves
+        pool_slots = asyncio.Semaphore(
+            max(
+                1,
+                self.bot.config.log_analyser_max_pending_tasks
+                // self.bot.config.log_analyser_max_running,
+            )
+        )
+        embeds = []
+        analysed_logs = []
+        for attachment in attachments:
+            if ticket is None:
+                # Turned away logs are only checked, so they're read like any other text file
+                log = self.new_log(
+                    attachment,
+                    pool_slots,
+                    False,
+                    blocklist_fields,
+                    self.bot.config.log_analyser_head_size,
+                )
+            else:
+                log = self.new_log(
+                    attachment, pool_slots, self.bot.config.log_analyser_profiling
+                )
+            # The embed is filled in once the log has been analysed
+            log["index"] = len(embeds)
+            embeds.append(None)
+            analysed_logs.append(log)
+        # Other text files are only checked against the blocklists, so nothing else is extracted from them
+        # and only their start is read, where a log would have its app info
+        checked_logs = [
+            self.new_log(
+                attachment,
+                pool_slots,
+                False,
+                blocklist_fields,
+                self.bot.config.log_analyser_head_size,
+            )
+            for attachment in checked_attachments
         ]
-        if not any(uploaded_logs_exist):
-            reply_message = await message.channel.send(
-                "Log detected, parsing...", reference=message
-            )
-            try:
-                embed = await self.log_file_read(message)
-                if "Ryujinx_" in filename:
-                    self.uploaded_log_info.append(
-                        {
-                            "filename": filename,
-                            "file_size": filesize,
-                            "link": log_file_link,
-                            "author": author_id,
-                        }
+        logs = analysed_logs + checked_logs
+
+        reply_message = None
+        try:
+            if len(analysed_logs) > 0 and ticket is not None:
+                detected = (
+                    "Log detected"
+                    if len(analysed_logs) == 1
+                    else f"{len(analysed_logs)} logs detected"
+                )
+                queue_position = self.analysis_scheduler.get_position(ticket)
+                if queue_position > 0:
+                    reply_message = await message.channel.send(
+                        f"{detected}, position {queue_position} in the analysis queue...",
+                        reference=message,
                     )
-                    # Avoid duplicate log file analysis, at least temporarily; keep track of the last few filenames of uploaded logs
-                    # this should help support channels not be flooded with too many log files
-                    # fmt: off
-                    self.uploaded_log_info = self.uploaded_log_info[-5:]
-                    # fmt: on
-                return await reply_message.edit(content=None, embed=embed)
-            except UnicodeDecodeError as error:
-                await reply_message.edit(
-                    content=author_mention,
-                    embed=Embed(
-                        description="This log file appears to be invalid. Please re-check and re-upload your log file.",
-                        colour=self.ryujinx_blue,
-                    ),
+                    await self.analysis_scheduler.wait(ticket)
+                    await reply_message.edit(content=f"{detected}, parsing...")
+                else:
+                    reply_message = await message.channel.send(
+                        f"{detected}, parsing...", reference=message
+                    )
+            elif ticket is not None:
+                await self.analysis_scheduler.wait(ticket)
+
+            # Every log is downloaded once and checked against the blocklists before any of them is analysed
+            rules = self.get_analysis_rules()
+            if ticket is None:
+                # Turned away messages don't wait in the queue, so only a few of them are checked at once
+                async with self.rejected_log_checks:
+                    await asyncio.gather(
+                        *(self.download_log_file(log, rules) for log in logs)
+                    )
+            else:
+                await asyncio.gather(
+                    *(self.download_log_file(log, rules) for log in logs)
                 )
-                logging.warning(error)
-            except Exception as error:
-                error_message = str(error)
-                if error_message != "":
-                    error_message = ":\n\n" + error_message
-
-                await reply_message.edit(
-                    content=f"Error: Couldn't parse log; parser threw `{type(error).__name__}` exception{error_message}"
+            blocked_embed = await self.check_downloaded_logs(message, logs)
+            if blocked_embed is not None:
+                if reply_message is not None:
+                    return await reply_message.edit(content=None, embed=blocked_embed)
+                return await message.channel.send(content=None, embed=blocked_embed)
+
+            for log in checked_logs:
+                if isinstance(log["error"], LogTooComplexError):
+                    logging.warning(
+                        f"Skipped checking {log['attachment'].url}, the log is too complex to analyse."
+                    )
+                elif log["error"] is not None:
+                    logging.warning(
+                        f"Skipped checking {log['attachment'].url}: {log['error']}"
+                    )
+
+            if ticket is None:
+                if len(analysed_logs) > 0:
+                    embeds = [
+                        Embed(
+                            description="Too many logs are being analysed right now. Please try again in a few minutes.",
+                            colour=self.ryujinx_blue,
+                        )
+                    ]
+                analysed_logs = []
+
+            # Duplicates are recognised by their content, so renamed copies are caught and new logs with an old name aren't
+            for log in analysed_logs:
+                if log["error"] is not None:
+                    continue
+                log["fingerprint"] = get_log_fingerprint(log["download"])
+                # Analysing a message again mustn't find the logs it was analysed with before
+                duplicate_link = self.log_fingerprints.find(
+                    log["fingerprint"], log_file_link
                 )
-                logging.warning(error)
-        else:
-            duplicate_log_file = next(
-                (
-                    elem
-                    for elem in self.uploaded_log_info
-                    if elem["filename"] == filename
-                    and elem["file_size"] == filesize
-                    and elem["author"] == author_id
-                ),
-                None,
-            )
-            await message.channel.send(
-                content=author_mention,
-                embed=Embed(
-                    description=f"The log file `{filename}` appears to be a duplicate [already uploaded here]({duplicate_log_file['link']}). Please upload a more recent file.",
-                    colour=self.ryujinx_blue,
-                ),
+                if duplicate_link is not None:
+                    embeds[log["index"]] = Embed(
+                        description=f"The log file `{log['attachment'].filename}` appears to be a duplicate [already uploaded here]({duplicate_link}). Please upload a more recent file.",
+                        colour=self.ryujinx_blue,
+                    )
+            analysed_logs = [
+                log for log in analysed_logs if embeds[log["index"]] is None
+            ]
+
+            analysed_embeds = await asyncio.gather(
+                *(self.log_file_read(message, log, rules) for log in analysed_logs)
             )
+            for log, embed in zip(analysed_logs, analysed_embeds):
+                embeds[log["index"]] = embed
+        finally:
+            if ticket is not None:
+                self.analysis_scheduler.release(ticket)
+
+        if len(embeds) == 0:
+            return
+        embed_groups = self.group_embeds(embeds)
+        if reply_message is not None:
+            await reply_message.edit(content=None, embeds=embed_groups[0])
+        else:
+            # None of the logs got analysed, so there's no reply to edit yet
+            await message.channel.send(content=author_mention, embeds=embed_groups[0])
+        for embed_group in embed_groups[1:]:
+            await message.channel.send(embeds=embed_group, reference=message)
 
     @commands.cooldown(3, 30, BucketType.channel)
     @commands.command(
-        aliases=["analyselog", "analyse_log", "analyze", "analyzelog", "analyze_log", "a"]
+        aliases=[
+            "analyselog",
+            "analyse_log",
+            "analyze",
+            "analyzelog",
+            "analyze_log",
+            "a",
+        ]
     )
     async def analyse(self, ctx: Context, attachment_number=1):
         await ctx.message.delete()
         if ctx.message.reference is not None:
-            message = await ctx.fetch_message(ctx.message.reference.message_id)
+            message = ctx.message.reference.resolved
+            if not isinstance(message, Message):
+                message = await ctx.fetch_message(ctx.message.reference.message_id)
             if len(message.attachments) >= attachment_number:
                 attachment = message.attachments[attachment_number - 1]
                 is_log_file, _ = self.is_valid_log_name(attachment)
 
                 if is_log_file:
-                    return await self.analyse_log_message(
-                        message, attachment_number - 1
-                    )
+                    return await self.analyse_log_message(message, [attachment])
                 else:
                     return await ctx.send(
                         f"The attached log file '{attachment.filename}' is not valid.",
@@ -662,57 +1263,46 @@ class LogFileReader(Cog):
         await self.bot.wait_until_ready()
         if message.author.bot:
             return
+        analysed_attachments = []
+        checked_attachments = []
+        is_misplaced_log = False
         for attachment in message.attachments:
             is_log_file, is_ryujinx_log_file = self.is_valid_log_name(attachment)
 
             if is_log_file and not is_ryujinx_log_file:
-                attached_log = message.attachments[0]
-                log_file = await self.download_file(attached_log.url)
-                # Large files show a header value when not downloaded completely
-                # this regex makes sure that the log text to read starts from the first timestamp, ignoring headers
-                log_file_header_regex = re.compile(
-                    r"\d{2}:\d{2}:\d{2}\.\d{3}.*", re.DOTALL
-                )
-                log_file_match = re.search(log_file_header_regex, log_file)
-                if log_file_match:
-                    log_file = log_file_match.group(0)
-                    if self.is_game_blocked(log_file):
-                        return await message.channel.send(
-                            content=None, embed=await self.blocked_game_action(message)
-                        )
-                    blocked_path = self.contains_blocked_paths(log_file)
-                    if blocked_path:
-                        return await message.channel.send(
-                            content=None,
-                            embed=await self.blocked_path_action(message, blocked_path),
-                        )
+                checked_attachments.append(attachment)
             elif (
                 is_log_file
                 and is_ryujinx_log_file
                 and message.channel.id in self.bot_log_allowed_channels.values()
             ):
-                return await self.analyse_log_message(
-                    message, message.attachments.index(attachment)
-                )
+                analysed_attachments.append(attachment)
             elif (
                 is_log_file
                 and is_ryujinx_log_file
                 and message.channel.id not in self.bot_log_allowed_channels.values()
             ):
-                return await message.author.send(
-                    content=message.author.mention,
-                    embed=Embed(
-                        description="\n".join(
-                            (
-                                f"Please upload Ryujinx log files to the correct location:\n",
-                                f'<#{self.bot.config.bot_log_allowed_channels["help"]}>: Help and troubleshooting',
-                                f'<#{self.bot.config.bot_log_allowed_channels["bot-spam"]}>: If you just want to see what the log analyzer says',
-                                f'<#{self.bot.config.bot_log_allowed_channels["pr-testing"]}>: Discussion of in-progress Pull Request builds',
-                            )
-                        ),
-                        colour=self.ryujinx_blue,
+                is_misplaced_log = True
+
+        if is_misplaced_log:
+            await message.author.send(
+                content=message.author.mention,
+                embed=Embed(
+                    description="\n".join(
+                        (
+                            f"Please upload Ryujinx log files to the correct location:\n",
+                            f'<#{self.bot.config.bot_log_allowed_channels["help"]}>: Help and troubleshooting',
+                            f'<#{self.bot.config.bot_log_allowed_channels["bot-spam"]}>: If you just want to see what the log analyzer says',
+                            f'<#{self.bot.config.bot_log_allowed_channels["pr-testing"]}>: Discussion of in-progress Pull Request builds',
+                        )
                     ),
-                )
+                    colour=self.ryujinx_blue,
+                ),
+            )
+        if len(analysed_attachments) > 0 or len(checked_attachments) > 0:
+            await self.analyse_log_message(
+                message, analysed_attachments, checked_attachments
+            )
 
 
 async def setup(bot):
@@ -341,3 +341,51 @@ yubico_otp_client_id = 1
 yubico_otp_secret = ""
 # Optional: If you provide a secret, requests will be signed
 # and responses will be verified.
+
+# == Only if you want to use cogs.logfilereader ==
+# Channels in which Ryujinx logs are analysed
+bot_log_allowed_channels = {
+    "help": 0,
+    "bot-spam": 0,
+    "pr-testing": 0,
+}
+# Number of worker processes used to analyse log files
+log_analyser_workers = 2
+# Seconds after which the analysis of a log file is given up
+log_analyser_timeout = 10
+# Analyses running or waiting for a worker process, after which new ones are turned away
+log_analyser_max_pending_tasks = 8
+# Memory in bytes used to cache the analysis results of recently uploaded logs
+log_analyser_cache_size = 16 * 1024 * 1024
+# Disk space in bytes used to keep cached analysis results in <state_dir>/log_cache (0 to disable)
+log_analyser_disk_cache_size = 0
+# Record how long every stage of the log analysis takes, queryable by staff with .log_stats
+log_analyser_profiling = False
+# Number of analysed logs the timing percentiles are calculated from
+log_analyser_stats_window = 500
+# Seconds of CPU time reading a log may take before it's rejected as too complex
+log_analyser_cpu_budget = 2
+# Seconds after which the remaining sections of a log analysis are skipped and the partial results are posted
+log_analyser_deadline = 2
+# Messages whose logs are read at the same time, the others wait in a queue
+log_analyser_max_running = 4
+# Messages waiting for their logs to be read, after which new ones are turned away
+log_analyser_max_queued = 20
+# Messages a single user can have waiting for their logs to be read
+log_analyser_max_queued_per_user = 2
+# Bytes read from the start of a log, more are only requested while the app info is still cut off
+log_analyser_head_size = 60000
+# Bytes read from the end of a log
+log_analyser_tail_size = 6000
+# Bytes read from a log at most
+log_analyser_max_download_size = 512 * 1024
+# Memory in bytes used to keep recently downloaded logs compressed, so .analyse doesn't download them again (0 to disable)
+log_analyser_download_cache_size = 32 * 1024 * 1024
+# Seconds a downloaded log is kept in memory
+log_analyser_download_cache_ttl = 60 * 60
+# Seconds an analysed log is remembered, so uploading it again is recognised as a duplicate
+log_analyser_duplicate_window = 24 * 60 * 60
+# Analysed logs remembered at most to recognise duplicates
+log_analyser_duplicate_index_size = 1000
+# Messages turned away from the full queue whose logs are checked against the blocklists at the same time
+log_analyser_max_rejected_checks = 2
@@ -1,5 +1,6 @@
 import json
 import os
+from typing import Iterable, Optional
 
 from robocop_ng.helpers.data_loader import read_json
 
@@ -20,11 +21,19 @@ def set_disabled_paths(bot, contents: list[str]):
         json.dump({"paths": contents}, f)
 
 
+def find_disabled_path(bot, paths: Iterable[str]) -> Optional[str]:
+    # Paths need to be stripped already, the disabled paths are only read once
+    disabled_paths = get_disabled_paths(bot)
+    for path in paths:
+        lowercase_path = path.lower()
+        for disabled_path in disabled_paths:
+            if disabled_path in lowercase_path:
+                return path
+    return None
+
+
 def is_path_disabled(bot, path: str) -> bool:
-    for disabled_path in get_disabled_paths(bot):
-        if disabled_path in path.strip().lower():
-            return True
-    return False
+    return find_disabled_path(bot, [path.strip()]) is not None
 
 
 def add_disabled_path(bot, disabled_path: str) -> bool:
@@ -0,0 +1,237 @@
+import logging
+import os
+from typing import Any, Callable, Iterable, Optional
+
+from robocop_ng.helpers.data_loader import read_json
+
+# Rules from <state_dir>/data/log_analyser_rules.json are added to these, a rule with the same id replaces the default
+default_rules = {
+    "errors": [
+        {
+            "id": "shader_cache_collision",
+            "terms": ["Cache collision found"],
+            "note": "⚠️ Cache collision detected. Investigate possible shader cache issues.",
+        },
+        {
+            "id": "dump_hash",
+            "terms": [
+                "ResultFsInvalidIvfcHash",
+                "ResultFsNonRealDataVerificationFailed",
+            ],
+            "note": "⚠️ Dump error detected. Redump your game, game update and DLC.",
+        },
+        {
+            "id": "shader_cache_corruption",
+            "terms": [
+                "Ryujinx.Graphics.Gpu.Shader.ShaderCache.Initialize()",
+                "System.IO.InvalidDataException: End of Central Directory record could not be found",
+                "ICSharpCode.SharpZipLib.Zip.ZipException: Cannot find central directory",
+            ],
+            "note": "⚠️ Cache corruption detected. Investigate possible shader cache issues.",
+        },
+        {
+            "id": "update_keys",
+            "terms": ["MissingKeyException"],
+            "note": "⚠️ Keys or firmware out of date, consider redumping them.",
+        },
+        {
+            "id": "file_permissions",
+            "terms": ["ResultFsPermissionDenied"],
+            "note": "⚠️ File permission error. Consider deleting save directory and allowing Ryujinx to make a new one.",
+        },
+        {
+            "id": "file_not_found",
+            "terms": ["ResultFsTargetNotFound"],
+            "note": "⚠️ Save not found error. Consider starting game without a save file or using a new save file.",
+        },
+        {
+            "id": "missing_services",
+            "terms": ["ServiceNotImplementedException"],
+            "settings": {"ignore_missing_services": "False"},
+            "note": "⚠️ Consider enabling `Ignore Missing Services` in Ryujinx settings.",
+        },
+        {
+            "id": "vulkan_out_of_memory",
+            "terms": ["ErrorOutOfDeviceMemory"],
+            "settings": {"texture_recompression": "Disabled"},
+            "note": "⚠️ Consider enabling `Texture Recompression` in Ryujinx settings.",
+        },
+    ],
+    "settings": [
+        {
+            "id": "dummy_audio_backend",
+            "setting": "audio_backend",
+            "value": "Dummy",
+            "note": "⚠️ Dummy audio backend, consider changing to SDL2 or OpenAL.",
+        },
+        {
+            "id": "pptc_disabled",
+            "setting": "pptc",
+            "value": "Disabled",
+            "note": "🔴 **PPTC cache should be enabled.**",
+        },
+        {
+            "id": "shader_cache_disabled",
+            "setting": "shader_cache",
+            "value": "Disabled",
+            "note": "🔴 **Shader cache should be enabled.**",
+        },
+        {
+            "id": "software_page_table",
+            "setting": "memory_manager",
+            "value": "SoftwarePageTable",
+            "note": "🔴 **`Software` setting in Memory Manager Mode will give slower performance than the default setting of `Host unchecked`.**",
+        },
+        {
+            "id": "ignore_missing_services",
+            "setting": "ignore_missing_services",
+            "value": "True",
+            "note": "⚠️ `Ignore Missing Services` being enabled can cause instability.",
+        },
+        {
+            "id": "vsync_unbounded",
+            "setting": "vsync",
+            "value": "Unbounded",
+            "note": "⚠️ V-Sync disabled can cause instability like games running faster than intended or longer load times.",
+        },
+        {
+            "id": "fs_integrity_disabled",
+            "setting": "fs_integrity",
+            "value": "Disabled",
+            "note": "⚠️ Disabling file integrity checks may cause corrupted dumps to not be detected.",
+        },
+        {
+            "id": "backend_threading_off",
+            "setting": "backend_threading",
+            "value": "Off",
+            "note": "🔴 **Graphics Backend Multithreading should be set to `Auto`.**",
+        },
+    ],
+}
+
+
+def get_log_analyser_rules_path(bot) -> str:
+    return os.path.join(bot.state_dir, "data/log_analyser_rules.json")
+
+
+def is_error_rule_valid(rule: Any) -> bool:
+    return (
+        isinstance(rule, dict)
+        and isinstance(rule.get("id"), str)
+        and isinstance(rule.get("note"), str)
+        and isinstance(rule.get("terms"), list)
+        and len(rule["terms"]) > 0
+        and all(isinstance(term, str) and len(term) > 0 for term in rule["terms"])
+        and isinstance(rule.get("settings", {}), dict)
+        and all(isinstance(value, str) for value in rule.get("settings", {}).values())
+    )
+
+
+def is_setting_rule_valid(rule: Any) -> bool:
+    return isinstance(rule, dict) and all(
+        isinstance(rule.get(key), str) for key in ("id", "setting", "value", "note")
+    )
+
+
+def get_valid_rules(
+    rules: dict[str, Any], rule_type: str, is_rule_valid: Callable[[Any], bool]
+) -> list[dict[str, Any]]:
+    type_rules = rules.get(rule_type, [])
+    if not isinstance(type_rules, list):
+        logging.warning(
+            f"Ignoring the {rule_type} log analyser rules, they aren't a list."
+        )
+        return []
+    valid_rules = []
+    for rule in type_rules:
+        if is_rule_valid(rule):
+            valid_rules.append(rule)
+        else:
+            logging.warning(f"Ignoring invalid {rule_type} log analyser rule: {rule}")
+    return valid_rules
+
+
+class LogAnalyserRules:
+    """Notes for known errors and settings, prepared once so matching them against a log stays cheap."""
+
+    error_rules: list[dict[str, Any]]
+    setting_rules: list[dict[str, Any]]
+    _error_terms: list[tuple[str, tuple[str, ...]]]
+    _setting_notes: dict[str, dict[str, list[str]]]
+
+    def __init__(self, rules: Optional[dict[str, list[dict[str, Any]]]] = None):
+        error_rules = {rule["id"]: rule for rule in default_rules["errors"]}
+        setting_rules = {rule["id"]: rule for rule in default_rules["settings"]}
+        if rules is not None:
+            # A single broken rule shouldn't stop every log from being analysed, so it's left out instead
+            error_rules.update(
+                (rule["id"], rule)
+                for rule in get_valid_rules(rules, "errors", is_error_rule_valid)
+            )
+            setting_rules.update(
+                (rule["id"], rule)
+                for rule in get_valid_rules(rules, "settings", is_setting_rule_valid)
+            )
+        self.error_rules = list(error_rules.values())
+        self.setting_rules = list(setting_rules.values())
+        self.__compile_error_rules()
+        self.__compile_setting_rules()
+
+    def __compile_error_rules(self):
+        # Checking every term with str.__contains__ is several times faster than a regex alternation of them
+        self._error_terms = [
+            (rule["id"], tuple(rule["terms"])) for rule in self.error_rules
+        ]
+
+    def __compile_setting_rules(self):
+        self._setting_notes = {}
+        for rule in self.setting_rules:
+            self._setting_notes.setdefault(rule["setting"], {}).setdefault(
+                rule["value"], []
+            ).append(rule["note"])
+
+    def find_errors(self, error_text: str) -> set[str]:
+        return {
+            rule_id
+            for rule_id, terms in self._error_terms
+            if any(term in error_text for term in terms)
+        }
+
+    def get_error_notes(
+        self, error_ids: Iterable[str], settings: dict[str, Optional[str]]
+    ) -> list[str]:
+        error_ids = set(error_ids)
+        return [
+            rule["note"]
+            for rule in self.error_rules
+            if rule["id"] in error_ids
+            and all(
+                settings.get(setting) == value
+                for setting, value in rule.get("settings", {}).items()
+            )
+        ]
+
+    def get_setting_notes(self, settings: dict[str, Optional[str]]) -> list[str]:
+        notes = []
+        for setting, value in settings.items():
+            notes.extend(self._setting_notes.get(setting, {}).get(value, ()))
+        return notes
+
+
+default_log_analyser_rules = LogAnalyserRules()
+
+
+def load_log_analyser_rules(bot) -> LogAnalyserRules:
+    rules = read_json(bot, get_log_analyser_rules_path(bot))
+    if not isinstance(rules, dict):
+        logging.error(
+            "Log analyser rules aren't a JSON object, using the default rules."
+        )
+        return default_log_analyser_rules
+    try:
+        return LogAnalyserRules(rules)
+    except Exception as error:
+        logging.error(
+            f"Couldn't load the log analyser rules, using the default rules: {error}"
+        )
+        return default_log_analyser_rules
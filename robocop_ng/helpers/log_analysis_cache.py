@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Optional
+
+from robocop_ng.helpers.disabled_ids import get_disabled_ids_path
+from robocop_ng.helpers.disabled_paths import get_disabled_paths_path
+from robocop_ng.helpers.log_analyser_rules import get_log_analyser_rules_path
+
+
+def get_blocklist_version(bot) -> str:
+    # Cached verdicts are only valid as long as the blocklists and rules they were made with didn't change
+    versions = []
+    for path in (
+        get_disabled_ids_path(bot),
+        get_disabled_paths_path(bot),
+        get_log_analyser_rules_path(bot),
+    ):
+        try:
+            stat = os.stat(path)
+            versions.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        except FileNotFoundError:
+            versions.append("0:0")
+    return "|".join(versions)
+
+
+class LogAnalysisCache:
+    max_memory_bytes: int
+    cache_dir: Optional[str]
+    max_disk_bytes: int
+    _entries: OrderedDict[str, bytes]
+    _memory_bytes: int
+    _disk_bytes: int
+
+    def __init__(
+        self,
+        max_memory_bytes: int,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = 0,
+    ):
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = cache_dir if max_disk_bytes > 0 else None
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for entry in os.scandir(self.cache_dir):
+                self._disk_bytes += entry.stat().st_size
+
+    @staticmethod
+    def get_key(log_bytes: bytes, *variant) -> str:
+        return "-".join((hashlib.sha256(log_bytes).hexdigest(), *map(str, variant)))
+
+    def __get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def __store_in_memory(self, key: str, entry: bytes):
+        if len(entry) > self.max_memory_bytes:
+            return
+        if key in self._entries:
+            self._memory_bytes -= len(self._entries.pop(key))
+        self._entries[key] = entry
+        self._memory_bytes += len(entry)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted_entry = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted_entry)
+
+    def __store_on_disk(self, key: str, entry: bytes):
+        path = self.__get_path(key)
+        if os.path.isfile(path):
+            self._disk_bytes -= os.path.getsize(path)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(entry)
+        os.replace(f"{path}.tmp", path)
+        self._disk_bytes += len(entry)
+
+        if self._disk_bytes > self.max_disk_bytes:
+            # Remove the least recently written entries first
+            cached_files = sorted(
+                os.scandir(self.cache_dir), key=lambda x: x.stat().st_mtime_ns
+            )
+            for cached_file in cached_files:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                self._disk_bytes -= cached_file.stat().st_size
+                os.remove(cached_file.path)
+
+    def remove(self, key: str):
+        if key in self._entries:
+            self._memory_bytes -= len(self._entries.pop(key))
+        if self.cache_dir is not None and os.path.isfile(self.__get_path(key)):
+            self._disk_bytes -= os.path.getsize(self.__get_path(key))
+            os.remove(self.__get_path(key))
+
+    def get(self, key: str, blocklist_version: str) -> Optional[dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self.cache_dir is not None and os.path.isfile(self.__get_path(key)):
+            with open(self.__get_path(key), "rb") as f:
+                entry = f.read()
+            self.__store_in_memory(key, entry)
+        else:
+            return None
+
+        try:
+            cached = json.loads(entry)
+        except json.JSONDecodeError:
+            self.remove(key)
+            return None
+
+        if cached["blocklist_version"] != blocklist_version:
+            self.remove(key)
+            return None
+        return cached["result"]
+
+    def put(self, key: str, blocklist_version: str, result: dict[str, Any]):
+        entry = json.dumps(
+            {"blocklist_version": blocklist_version, "result": result}
+        ).encode("UTF-8")
+        self.__store_in_memory(key, entry)
+        if self.cache_dir is not None:
+            self.__store_on_disk(key, entry)
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Collection, Optional
+
+from robocop_ng.helpers.log_analyser_rules import LogAnalyserRules
+from robocop_ng.helpers.ryujinx_log_analyser import (
+    LogAnalyser,
+    LogTokenizer,
+    ParsedLog,
+    StageTimings,
+)
+
+
+def get_deadline(time_budget: Optional[float]) -> Optional[float]:
+    if time_budget is None:
+        return None
+    return time.monotonic() + time_budget
+
+
+def read_log(
+    log_bytes: bytes,
+    cpu_budget: Optional[float] = None,
+    profile: bool = False,
+    rules: Optional[LogAnalyserRules] = None,
+    fields: Optional[Collection[str]] = None,
+    time_budget: Optional[float] = None,
+) -> dict[str, Any]:
+    # Tokenizing is most of the work done for a log, so it runs in a worker process as well
+    timings = StageTimings() if profile else None
+    # The clock starts here, so waiting for a worker or starting one doesn't use up the time budget
+    deadline = get_deadline(time_budget)
+    parsed_log = LogTokenizer(
+        timings, cpu_budget, rules=rules, fields=fields, deadline=deadline
+    ).tokenize_bytes(log_bytes)
+    return {
+        "parsed_log": parsed_log,
+        "time_left": (
+            max(deadline - time.monotonic(), 0.0) if deadline is not None else None
+        ),
+        "timings": timings.stages if timings is not None else None,
+    }
+
+
+def analyse_log(
+    parsed_log: ParsedLog,
+    is_channel_allowed: bool,
+    pr_channel: int,
+    profile: bool = False,
+    time_budget: Optional[float] = None,
+    rules: Optional[LogAnalyserRules] = None,
+) -> dict[str, Any]:
+    # This runs inside a worker process, so everything returned here has to be picklable
+    result = {
+        "analysis": None,
+        "ryujinx_version": parsed_log.get_ryujinx_version(),
+        "error": None,
+        "timings": None,
+    }
+    timings = StageTimings() if profile else None
+
+    try:
+        analyser = LogAnalyser(parsed_log, timings, get_deadline(time_budget), rules)
+        result["analysis"] = analyser.analyse_discord(is_channel_allowed, pr_channel)
+    except Exception as error:
+        # The caller raises this again once the blocklist checks have passed
+        result["error"] = error
+
+    if timings is not None:
+        result["timings"] = timings.stages
+    return result
+
+
+class LogAnalysisPoolFullError(RuntimeError):
+    pass
+
+
+class LogAnalysisPool:
+    max_workers: int
+    task_timeout: float
+    max_pending_tasks: int
+    _pending_tasks: int
+    _free_workers: asyncio.Semaphore
+    _executor: ProcessPoolExecutor
+
+    def __init__(self, max_workers: int, task_timeout: float, max_pending_tasks: int):
+        self.max_workers = max_workers
+        self.task_timeout = task_timeout
+        self.max_pending_tasks = max_pending_tasks
+        self._pending_tasks = 0
+        self._free_workers = asyncio.Semaphore(max_workers)
+        self._executor = self.__create_executor()
+
+    def __create_executor(self) -> ProcessPoolExecutor:
+        # Forking the bot process would copy its event loop and connection state into every worker
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def __restart(self, executor: ProcessPoolExecutor):
+        if executor is not self._executor:
+            # Another task already replaced this pool
+            return
+        # Running tasks can't be interrupted, so their workers are terminated instead of being left to run forever
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        self._executor = self.__create_executor()
+
+    @property
+    def is_saturated(self) -> bool:
+        return self._pending_tasks >= self.max_pending_tasks
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        if self.is_saturated:
+            logging.warning(
+                f"Log analysis pool is saturated ({self._pending_tasks} pending tasks), "
+                f"turning '{func.__name__}' away."
+            )
+            raise LogAnalysisPoolFullError(
+                f"The log analysis pool already has {self._pending_tasks} pending tasks."
+            )
+
+        self._pending_tasks += 1
+        try:
+            # Tasks wait for a free worker here, so only the time they actually run counts against the timeout
+            async with self._free_workers:
+                return await self.__run(func, *args)
+        finally:
+            self._pending_tasks -= 1
+
+    async def __run(self, func: Callable[..., Any], *args) -> Any:
+        while True:
+            executor = self._executor
+            try:
+                return await asyncio.wait_for(
+                    asyncio.get_running_loop().run_in_executor(executor, func, *args),
+                    self.task_timeout,
+                )
+            except asyncio.TimeoutError:
+                logging.warning(
+                    f"'{func.__name__}' exceeded {self.task_timeout}s, restarting the log analysis pool."
+                )
+                self.__restart(executor)
+                raise
+            except BrokenProcessPool:
+                if executor is not self._executor:
+                    # The worker was terminated because another task timed out, so this one is run again
+                    continue
+                logging.error(
+                    "A log analysis worker died, restarting the log analysis pool."
+                )
+                self.__restart(executor)
+                raise
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,131 @@
+import asyncio
+from collections import OrderedDict, deque
+from typing import Iterator, Optional
+
+
+class LogAnalysisTicket:
+    channel_id: int
+    user_id: int
+    is_running: bool
+    is_released: bool
+    started: asyncio.Future
+
+    def __init__(self, channel_id: int, user_id: int):
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.is_running = False
+        self.is_released = False
+        self.started = asyncio.get_running_loop().create_future()
+
+
+class LogAnalysisScheduler:
+    """Runs a limited number of log analyses at once, the queued ones take turns per channel and then per user."""
+
+    max_running: int
+    max_queued: int
+    max_queued_per_user: int
+    _running: int
+    _queued: int
+    _queued_per_user: dict[int, int]
+    _queues: OrderedDict[int, OrderedDict[int, deque[LogAnalysisTicket]]]
+
+    def __init__(self, max_running: int, max_queued: int, max_queued_per_user: int):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+        self._running = 0
+        self._queued = 0
+        self._queued_per_user = {}
+        self._queues = OrderedDict()
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def enqueue(self, channel_id: int, user_id: int) -> Optional[LogAnalysisTicket]:
+        # Logs that don't fit in the queue are turned away instead of piling up
+        if self._queued >= self.max_queued:
+            return None
+        if self._queued_per_user.get(user_id, 0) >= self.max_queued_per_user:
+            return None
+
+        ticket = LogAnalysisTicket(channel_id, user_id)
+        self._queues.setdefault(channel_id, OrderedDict()).setdefault(
+            user_id, deque()
+        ).append(ticket)
+        self._queued += 1
+        self._queued_per_user[user_id] = self._queued_per_user.get(user_id, 0) + 1
+        self.__dispatch()
+        return ticket
+
+    def __iter_queue(self) -> Iterator[LogAnalysisTicket]:
+        # Walks the queue in the same order __dispatch starts the tickets
+        channels = deque(
+            deque(deque(tickets) for tickets in users.values())
+            for users in self._queues.values()
+        )
+        while len(channels) > 0:
+            users = channels.popleft()
+            tickets = users.popleft()
+            yield tickets.popleft()
+            if len(tickets) > 0:
+                users.append(tickets)
+            if len(users) > 0:
+                channels.append(users)
+
+    def get_position(self, ticket: LogAnalysisTicket) -> int:
+        if ticket.is_running or ticket.is_released:
+            return 0
+        for position, queued_ticket in enumerate(self.__iter_queue(), 1):
+            if queued_ticket is ticket:
+                return position
+        return 0
+
+    def __remove(self, ticket: LogAnalysisTicket):
+        users = self._queues[ticket.channel_id]
+        tickets = users[ticket.user_id]
+        tickets.remove(ticket)
+        if len(tickets) == 0:
+            del users[ticket.user_id]
+        if len(users) == 0:
+            del self._queues[ticket.channel_id]
+        self._queued -= 1
+        self._queued_per_user[ticket.user_id] -= 1
+        if self._queued_per_user[ticket.user_id] == 0:
+            del self._queued_per_user[ticket.user_id]
+
+    def __dispatch(self):
+        while self._running < self.max_running and len(self._queues) > 0:
+            channel_id, users = next(iter(self._queues.items()))
+            user_id, tickets = next(iter(users.items()))
+            ticket = tickets[0]
+            self.__remove(ticket)
+            # Whoever just had their turn goes to the back of the line
+            if user_id in users:
+                users.move_to_end(user_id)
+            if channel_id in self._queues:
+                self._queues.move_to_end(channel_id)
+
+            ticket.is_running = True
+            self._running += 1
+            ticket.started.set_result(None)
+
+    async def wait(self, ticket: LogAnalysisTicket):
+        await asyncio.shield(ticket.started)
+
+    def release(self, ticket: LogAnalysisTicket):
+        if ticket.is_released:
+            return
+        ticket.is_released = True
+        if ticket.is_running:
+            ticket.is_running = False
+            self._running -= 1
+        else:
+            # The analysis was cancelled before it got its turn
+            self.__remove(ticket)
+            ticket.started.cancel()
+        self.__dispatch()
@@ -0,0 +1,63 @@
+import heapq
+from collections import deque
+
+from robocop_ng.helpers.ryujinx_log_analyser import StageTimings
+
+
+class LogAnalysisStats:
+    window: int
+    max_slowest_logs: int
+    cache_hits: int
+    _samples: dict[str, deque[tuple[float, float]]]
+    _total_times: deque[tuple[float, str]]
+
+    def __init__(self, window: int, max_slowest_logs: int = 5):
+        self.window = window
+        self.max_slowest_logs = max_slowest_logs
+        self.cache_hits = 0
+        self._samples = {}
+        self._total_times = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return max((len(samples) for samples in self._samples.values()), default=0)
+
+    def record(self, timings: StageTimings, log_name: str):
+        # Cached analyses skip most stages, they'd only drag the percentiles down
+        if timings.cached:
+            self.cache_hits += 1
+            return
+
+        total_time = 0.0
+        for stage, record in timings.stages.items():
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+            self._samples[stage].append((record["wall_time"], record["cpu_time"]))
+            total_time += record["wall_time"]
+
+        # The slowest logs are picked from the same window as the percentiles, so old logs drop out of both
+        self._total_times.append((total_time, log_name))
+
+    @staticmethod
+    def __get_percentile(values: list[float], percentile: int) -> float:
+        # Nearest-rank percentile of already sorted values
+        return values[max(0, -(-percentile * len(values) // 100) - 1)]
+
+    def get_percentiles(
+        self, percentiles: tuple[int, ...] = (50, 95, 99)
+    ) -> dict[str, dict[str, float]]:
+        stage_percentiles = {}
+        for stage, samples in self._samples.items():
+            wall_times = sorted(sample[0] for sample in samples)
+            cpu_times = sorted(sample[1] for sample in samples)
+            stage_percentiles[stage] = {"count": len(samples)}
+            for percentile in percentiles:
+                stage_percentiles[stage][f"wall_p{percentile}"] = self.__get_percentile(
+                    wall_times, percentile
+                )
+                stage_percentiles[stage][f"cpu_p{percentile}"] = self.__get_percentile(
+                    cpu_times, percentile
+                )
+        return stage_percentiles
+
+    def get_slowest_logs(self) -> list[tuple[float, str]]:
+        return heapq.nlargest(self.max_slowest_logs, self._total_times)
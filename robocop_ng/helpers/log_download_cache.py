@@ -0,0 +1,58 @@
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+
+class LogDownloadCache:
+    """Recently downloaded logs, compressed and only kept for a while, so they can be read again without the CDN."""
+
+    max_bytes: int
+    ttl: float
+    _entries: OrderedDict[str, tuple[float, bytes]]
+    _bytes: int
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def get_key(attachment_id: int, attachment_size: int) -> str:
+        return f"{attachment_id}-{attachment_size}"
+
+    def __remove_expired(self):
+        # Entries are never refreshed, so the oldest ones are always at the front
+        now = time.monotonic()
+        while len(self._entries) > 0:
+            expires_at, entry = next(iter(self._entries.values()))
+            if expires_at > now:
+                break
+            self._entries.popitem(last=False)
+            self._bytes -= len(entry)
+
+    def get(self, key: str) -> Optional[bytes]:
+        self.__remove_expired()
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        return zlib.decompress(cached[1])
+
+    def put(self, key: str, log_bytes: bytes):
+        if self.max_bytes <= 0:
+            return
+        self.__remove_expired()
+        entry = zlib.compress(log_bytes)
+        if len(entry) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key)[1])
+        self._entries[key] = (time.monotonic() + self.ttl, entry)
+        self._bytes += len(entry)
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_entry) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted_entry)
@@ -0,0 +1,152 @@
+import hashlib
+import time
+from array import array
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from robocop_ng.helpers.ryujinx_log_analyser import error_signature_pattern
+
+simhash_bits = 64
+# A distance of up to simhash_bands - 1 bits always leaves at least one band unchanged
+simhash_bands = 4
+simhash_band_bits = simhash_bits // simhash_bands
+# Lines which tell apart what a log is about: the game, the settings it ran with and the errors it ran into
+context_line_needles = (
+    "|E| ",
+    "Application Loaded:",
+    "Build ids found for ",
+    "PrintRoSectionInfo",
+    "LogValueChange",
+)
+
+
+class LogFingerprint:
+    exact_hash: str
+    context_hash: str
+    simhash: int
+
+    def __init__(self, exact_hash: str, context_hash: str, simhash: int):
+        self.exact_hash = exact_hash
+        self.context_hash = context_hash
+        self.simhash = simhash
+
+    def get_bands(self) -> list[int]:
+        band_mask = (1 << simhash_band_bits) - 1
+        return [
+            (self.simhash >> (band * simhash_band_bits)) & band_mask
+            for band in range(simhash_bands)
+        ]
+
+
+def get_log_fingerprint(log_bytes: bytes) -> LogFingerprint:
+    exact_hash = hashlib.sha256(log_bytes).hexdigest()
+    # Timestamps are kept, so the next session of the same game doesn't look like the last one
+    lines = [
+        line.rstrip()
+        for line in log_bytes.decode("UTF-8", errors="replace").splitlines()
+    ]
+    lines = [line for line in lines if len(line) > 0]
+    # Repeated errors only differ in their timestamps, thread ids and addresses, so those are left out
+    context_lines = sorted(
+        {
+            error_signature_pattern.sub("", line)
+            for line in lines
+            if any(needle in line for needle in context_line_needles)
+        }
+    )
+    context_hash = hashlib.sha256("\n".join(context_lines).encode()).hexdigest()
+    # The index only lives in memory, so the per-process salt of str hashes doesn't matter
+    line_hashes = array("q", map(hash, lines)).tobytes()
+
+    # Counting the byte values at every offset of the line hashes gives how many lines have each bit set,
+    # without looking at every bit of every line in Python
+    simhash = 0
+    hash_size = array("q").itemsize
+    for offset in range(hash_size):
+        byte_counts = Counter(line_hashes[offset::hash_size])
+        for bit in range(8):
+            bit_count = sum(
+                count for value, count in byte_counts.items() if value & (1 << bit)
+            )
+            if bit_count * 2 > len(lines):
+                simhash |= 1 << (offset * 8 + bit)
+    return LogFingerprint(exact_hash, context_hash, simhash)
+
+
+class LogFingerprintIndex:
+    """Fingerprints of recently analysed logs, to find exact and near duplicates of new ones."""
+
+    window: float
+    max_entries: int
+    max_distance: int
+    _entries: OrderedDict[int, tuple[float, LogFingerprint, str]]
+    _exact_hashes: dict[str, int]
+    _bands: list[dict[int, set[int]]]
+    _next_entry_id: int
+
+    def __init__(self, window: float, max_entries: int, max_distance: int = 3):
+        self.window = window
+        self.max_entries = max_entries
+        self.max_distance = min(max_distance, simhash_bands - 1)
+        self._entries = OrderedDict()
+        self._exact_hashes = {}
+        self._bands = [{} for _ in range(simhash_bands)]
+        self._next_entry_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __remove_oldest(self):
+        entry_id, (_, fingerprint, _) = self._entries.popitem(last=False)
+        if self._exact_hashes.get(fingerprint.exact_hash) == entry_id:
+            del self._exact_hashes[fingerprint.exact_hash]
+        for band, band_value in zip(self._bands, fingerprint.get_bands()):
+            entry_ids = band[band_value]
+            entry_ids.discard(entry_id)
+            if len(entry_ids) == 0:
+                del band[band_value]
+
+    def __remove_expired(self):
+        # Entries are never refreshed, so the oldest ones are always at the front
+        now = time.monotonic()
+        while len(self._entries) > 0:
+            expires_at, _, _ = next(iter(self._entries.values()))
+            if expires_at > now:
+                break
+            self.__remove_oldest()
+
+    def find(
+        self, fingerprint: LogFingerprint, exclude_link: Optional[str] = None
+    ) -> Optional[str]:
+        self.__remove_expired()
+        entry_id = self._exact_hashes.get(fingerprint.exact_hash)
+        if entry_id is not None and self._entries[entry_id][2] != exclude_link:
+            return self._entries[entry_id][2]
+
+        # Only the latest exact match is kept by hash, older copies of an excluded one are still found by their bands
+        for band, band_value in zip(self._bands, fingerprint.get_bands()):
+            for entry_id in band.get(band_value, ()):
+                _, candidate, link = self._entries[entry_id]
+                # Similar logs of another game, with other settings or other errors are new attempts, not duplicates
+                if (
+                    link == exclude_link
+                    or candidate.context_hash != fingerprint.context_hash
+                ):
+                    continue
+                distance = (candidate.simhash ^ fingerprint.simhash).bit_count()
+                if distance <= self.max_distance:
+                    return link
+        return None
+
+    def add(self, fingerprint: LogFingerprint, link: str):
+        if self.max_entries <= 0:
+            return
+        self.__remove_expired()
+        entry_id = self._next_entry_id
+        self._next_entry_id += 1
+        self._entries[entry_id] = (time.monotonic() + self.window, fingerprint, link)
+        self._exact_hashes[fingerprint.exact_hash] = entry_id
+        for band, band_value in zip(self._bands, fingerprint.get_bands()):
+            band.setdefault(band_value, set()).add(entry_id)
+        while len(self._entries) > self.max_entries:
+            self.__remove_oldest()
@@ -1,27 +1,46 @@
+import bisect
+import contextlib
+import functools
+import glob
+import hashlib
+import mmap
+import os
 import re
+import time
 from argparse import ArgumentError
 from enum import IntEnum, auto, EnumType
-from typing import Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    ContextManager,
+    Iterator,
+    Optional,
+    Union,
+)
 
 from robocop_ng.helpers.disabled_ids import is_build_id_valid
+from robocop_ng.helpers.log_analyser_rules import (
+    LogAnalyserRules,
+    default_log_analyser_rules,
+)
 from robocop_ng.helpers.size import Size
 
 
-class CommonError(IntEnum):
-    SHADER_CACHE_COLLISION = auto()
-    DUMP_HASH = auto()
-    SHADER_CACHE_CORRUPTION = auto()
-    UPDATE_KEYS = auto()
-    FILE_PERMISSIONS = auto()
-    FILE_NOT_FOUND = auto()
-    MISSING_SERVICES = auto()
-    VULKAN_OUT_OF_MEMORY = auto()
-
-
 class LogDataError(RuntimeError):
     def __init__(self, message: str):
+        self.message = message
         self.add_note(message)
 
+    def __reduce__(self):
+        # Required to raise this error again after it was sent back from a worker process
+        return self.__class__, (self.message,)
+
+
+class LogTooComplexError(LogDataError):
+    pass
+
+
 class RyujinxVersion(IntEnum):
     STABLE = auto()
     CANARY = auto()
@@ -31,6 +50,15 @@ class RyujinxVersion(IntEnum):
     MIRROR = auto()
     CUSTOM = auto()
 
+
+# Logs of these versions are rejected instead of analysed
+unsupported_ryujinx_versions = (
+    RyujinxVersion.ORIGINAL_PROJECT,
+    RyujinxVersion.ORIGINAL_PROJECT_LDN,
+    RyujinxVersion.MIRROR,
+)
+
+
 original_project_version_pattern = re.compile(r"^1\.(0|1)\.\d+$")
 mainline_version_pattern = re.compile(r"^1\.(2|3)\.\d+$")
 canary_version_pattern = re.compile(r"^c1\.(2|3)\.\d+$")
@@ -38,155 +66,873 @@ pr_version_pattern = re.compile(r"^1\.2\.\d\+([a-f]|\d){7}$")
 ldn_version_pattern = re.compile(r"^\d\.\d\.\d-ldn\d+\.\d+(?:\.\d+|$)")
 mirror_version_pattern = re.compile(r"^r\.(\d|\w){7}$")
 
+# Bytes which can only appear in the middle of a UTF-8 encoded character
+utf8_continuation_bytes = bytes(range(0x80, 0xC0))
+log_start_pattern = re.compile(r"\d{2}:\d{2}:\d{2}\.\d{3}")
+log_start_bytes_pattern = re.compile(log_start_pattern.pattern.encode())
+timestamp_pattern = re.compile(r"(\d{2}:\d{2}:\d{2}\.\d{3})\s+?\|")
+cpu_pattern = re.compile(r"CPU:\s([^;\n\r]*)")
+ram_pattern = re.compile(
+    r"RAM: Total ([\d.]+) ({0}) ; Available ([\d.]+) ({0})".format(
+        "|".join(Size.names())
+    )
+)
+os_pattern = re.compile(r"Operating System:\s([^;\n\r]*)")
+gpu_pattern = re.compile(r"PrintGpuInformation:\s([^;\n\r]*)")
+logs_enabled_pattern = re.compile(r"Logs Enabled:\s([^;\n\r]*)")
+setting_change_pattern = re.compile(r"LogValueChange: (\S+)\s")
+app_loaded_pattern = re.compile(r"Loader [A-Za-z]*: Application Loaded:\s([^;\n\r]*)")
+mod_start_pattern = re.compile(r"Found\s(enabled|disabled)?\s?mod\s\'")
+mod_type_start_pattern = re.compile(r"\'\s\[")
+cheat_start_pattern = re.compile(r"Installing cheat\s'")
+# Make sure to skip cheats which fail to compile
+failed_cheat_pattern = re.compile(
+    r"\s\d{2}:\d{2}:\d{2}\.\d{3}\s\|E\|\sTamperMachine\sCompile"
+)
+controller_pattern = re.compile(r"Hid Configure: ([^\r\n]+)")
+build_ids_header_pattern = re.compile(
+    r"Build ids found for (?:title|application) ([a-zA-Z0-9]*):"
+)
+app_id_pattern = re.compile(r".* \[([a-zA-Z0-9]*)\]")
+# Starting a match in the middle of a run of separators would only fail again after rescanning the run
+filepath_pattern = re.compile(r"(?:[A-Za-z]:)?(?<![\\/])(?:[\\/]+[^\\/:\"\r\n]+)+")
+homebrew_pattern = re.compile(r"Application: Loading as [Hh]omebrew")
+# Only these log messages contain the paths of games, mods and save data, stack traces and urls are ignored
+path_line_needles = (
+    "Loader ",
+    "ServiceFs ",
+    "FileSystem",
+    "VFS",
+    "Application Loaded:",
+    "Launch Mode:",
+    "Loading as ",
+    "Module:",
+)
+# Parts of an error block which differ between repetitions of the same error
+error_signature_pattern = re.compile(
+    r"\d{2}:\d{2}:\d{2}\.\d{3}|(?<=Thread\.)\d+|0x[0-9A-Fa-f]+"
+)
+# Fields of a ParsedLog which a LogTokenizer can be asked to extract
+parsed_log_fields = frozenset(
+    (
+        "errors",
+        "timeline",
+        "last_timestamp",
+        "cpu",
+        "ram",
+        "os",
+        "gpu",
+        "ryu_version",
+        "ryu_firmware",
+        "logs_enabled",
+        "settings",
+        "app_name",
+        "build_ids",
+        "main_ro_section",
+        "filepaths",
+        "is_homebrew",
+        "mods",
+        "cheats",
+        "controllers",
+        "default_user_profile",
+        "using_metal",
+    )
+)
+# Everything the blocked game, blocked path and modified log checks look at
+blocklist_fields = frozenset(
+    ("app_name", "build_ids", "main_ro_section", "filepaths", "is_homebrew")
+)
+
+
+class NoteDetector:
+    """A rule adding notes to an analysis, it only runs once the fields it depends on are available."""
+
+    name: str
+    depends_on: tuple[str, ...]
+    detect: Callable[["LogAnalyser", set[str]], None]
+
+    def __init__(
+        self,
+        name: str,
+        depends_on: tuple[str, ...],
+        detect: Callable[["LogAnalyser", set[str]], None],
+    ):
+        self.name = name
+        self.depends_on = depends_on
+        self.detect = detect
+
+
+# Detectors run in the order they are registered in
+note_detectors: list[NoteDetector] = []
+
+
+def note_detector(name: str, depends_on: tuple[str, ...] = ()):
+    def register(detect: Callable[["LogAnalyser", set[str]], None]):
+        note_detectors.append(NoteDetector(name, depends_on, detect))
+        return detect
+
+    return register
+
+
+class StageTimings:
+    """Wall time, CPU time and match count of every stage that ran while analysing a log."""
+
+    input_size: int
+    cached: bool
+    stages: dict[str, dict[str, float]]
+
+    def __init__(self, input_size: int = 0):
+        self.input_size = input_size
+        self.cached = False
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def measure(
+        self, stage: str, count_matches: Optional[Callable[[], int]] = None
+    ) -> Iterator[None]:
+        record = self.stages.setdefault(
+            stage, {"wall_time": 0.0, "cpu_time": 0.0, "matches": 0}
+        )
+        wall_start = time.perf_counter()
+        # Thread time, so whatever other threads of the process are doing doesn't count
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            record["wall_time"] += time.perf_counter() - wall_start
+            record["cpu_time"] += time.thread_time() - cpu_start
+        if count_matches is not None:
+            record["matches"] = count_matches()
+
+    def update(self, stages: dict[str, dict[str, float]]):
+        self.stages.update(stages)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "input_size": self.input_size,
+            "cached": self.cached,
+            "stages": self.stages,
+        }
+
+
+def measure_stage(
+    timings: Optional[StageTimings],
+    stage: str,
+    count_matches: Optional[Callable[[], int]] = None,
+) -> ContextManager[None]:
+    if timings is None:
+        return contextlib.nullcontext()
+    return timings.measure(stage, count_matches)
+
+
+class ErrorSignature:
+    """Error blocks which only differ in their timestamps, thread ids and addresses."""
+
+    signature: str
+    lines: list[str]
+    count: int
+    first_timestamp: Optional[str]
+    last_timestamp: Optional[str]
+
+    def __init__(self, signature: str, lines: list[str], timestamp: Optional[str]):
+        self.signature = signature
+        # Only the first block is kept as an example of the error
+        self.lines = lines
+        self.count = 1
+        self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+
+    def add(self, timestamp: Optional[str]):
+        self.count += 1
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "signature": self.signature,
+            "lines": self.lines,
+            "count": self.count,
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+        }
+
+
+class ParsedLog:
+    """Everything the bot and the analyser need from a log, collected by a single LogTokenizer pass.
+
+    Fields the tokenizer wasn't asked to extract keep their defaults.
+    """
+
+    size: int
+    line_count: int
+    has_log_entries: bool
+    errors: dict[str, ErrorSignature]
+    error_count: int
+    dropped_error_count: int
+    last_error: Optional[list[str]]
+    # Ids of the error rules which matched any of the errors
+    common_errors: set[str]
+    cpu: Optional[str]
+    ram: Optional[tuple[str, str, str, str]]
+    os: Optional[str]
+    gpu: Optional[str]
+    ryu_version: Optional[str]
+    ryu_firmware: Optional[str]
+    logs_enabled: Optional[str]
+    settings: dict[str, str]
+    app_name: Optional[str]
+    app_id_from_build_ids: Optional[str]
+    build_ids: Optional[list[str]]
+    main_ro_section: Optional[dict[str, Union[str, list[str]]]]
+    # Stripped but in their original casing, so a blocked path is shown the way it was logged
+    filepaths: set[str]
+    mods: list[tuple[str, str, str]]
+    cheats: list[str]
+    controllers: list[str]
+    last_timestamp: Optional[str]
+    # Number of error and warning entries for every minute since the emulator started
+    timeline: dict[int, list[int]]
+    first_error_after_boot: Optional[str]
+    is_homebrew: bool
+    default_user_profile: bool
+    using_metal: bool
+
+    def __init__(self):
+        self.size = 0
+        self.line_count = 0
+        self.has_log_entries = False
+        self.errors = {}
+        self.error_count = 0
+        self.dropped_error_count = 0
+        self.last_error = None
+        self.common_errors = set()
+        self.cpu = None
+        self.ram = None
+        self.os = None
+        self.gpu = None
+        self.ryu_version = None
+        self.ryu_firmware = None
+        self.logs_enabled = None
+        self.settings = {}
+        self.app_name = None
+        self.app_id_from_build_ids = None
+        self.build_ids = None
+        self.main_ro_section = None
+        self.filepaths = set()
+        self.mods = []
+        self.cheats = []
+        self.controllers = []
+        self.last_timestamp = None
+        self.timeline = {}
+        self.first_error_after_boot = None
+        self.is_homebrew = False
+        self.default_user_profile = False
+        self.using_metal = False
+
+    def get_app_info(
+        self,
+    ) -> Optional[tuple[str, str, str, list[str], dict[str, str]]]:
+        if self.app_name is None or self.build_ids is None:
+            return None
+        app_id_match = app_id_pattern.match(self.app_name)
+        if app_id_match:
+            app_id = app_id_match.group(1).strip().upper()
+        else:
+            app_id = ""
+        return (
+            self.app_name,
+            app_id,
+            self.app_id_from_build_ids,
+            self.build_ids,
+            self.main_ro_section,
+        )
+
+    def get_ryujinx_version(self) -> tuple["RyujinxVersion", str]:
+        return LogAnalyser.parse_ryujinx_version(
+            self.ryu_version if self.ryu_version is not None else "Unknown"
+        )
+
+    def is_unsupported(self) -> bool:
+        return (self.gpu is not None and "Mali" in self.gpu) or (
+            self.get_ryujinx_version()[0] in unsupported_ryujinx_versions
+        )
+
+
+class LogTokenizer:
+    """Walks a log once and hands every line to the extractors interested in it."""
+
+    _log: ParsedLog
+    _timings: Optional[StageTimings]
+    _cpu_budget: Optional[float]
+    _deadline: Optional[float]
+    _max_error_signatures: int
+    _rules: LogAnalyserRules
+
+    def __init__(
+        self,
+        timings: Optional[StageTimings] = None,
+        cpu_budget: Optional[float] = None,
+        max_error_signatures: int = 100,
+        rules: Optional[LogAnalyserRules] = None,
+        fields: Optional[Collection[str]] = None,
+        deadline: Optional[float] = None,
+    ):
+        self._log = ParsedLog()
+        self._rules = rules if rules is not None else default_log_analyser_rules
+        self._timings = timings
+        self._cpu_budget = cpu_budget
+        # Once this time.monotonic() value has passed, only the blocklist fields are extracted from the rest of the log
+        self._deadline = deadline
+        self._max_error_signatures = max_error_signatures
+
+        self.__cpu_time = 0.0
+        self.__cpu_start = None
+
+        self.__curr_error_lines = []
+        self.__is_error_line = False
+        self.__is_booted = False
+        self.__pending_cheat_line = None
+        self.__partial_line = ""
+        # Build ids and the read-only section are listed on the indented lines following their header
+        self.__block = None
+        self.__block_app_id = None
+        self.__block_lines = []
+        # Substring checks are cheap, so they decide which extractors get to run a regex on a line
+        self.__field_extractors = (
+            ("cpu", "CPU:", self.__extract_cpu),
+            ("ram", "RAM: Total", self.__extract_ram),
+            ("os", "Operating System:", self.__extract_os),
+            ("gpu", "PrintGpuInformation:", self.__extract_gpu),
+            ("ryu_version", "Version:", self.__extract_version),
+            ("ryu_firmware", "Firmware Version:", self.__extract_firmware),
+            ("logs_enabled", "Logs Enabled:", self.__extract_logs_enabled),
+            ("settings", "LogValueChange: ", self.__extract_setting),
+            ("app_name", "Application Loaded:", self.__extract_app_name),
+            ("build_ids", "Build ids found for ", self.__extract_build_ids_header),
+            (
+                "main_ro_section",
+                "PrintRoSectionInfo: main:",
+                self.__extract_ro_section_header,
+            ),
+            ("is_homebrew", "Loading as ", self.__extract_homebrew),
+            ("mods", "Found", self.__extract_mods),
+            ("cheats", "Installing cheat", self.__extract_cheat),
+            ("controllers", "Hid Configure: ", self.__extract_controllers),
+            (
+                "default_user_profile",
+                "UserId: 00000000000000010000000000000000",
+                self.__extract_user_profile,
+            ),
+            ("using_metal", "Gpu : Backend (Metal): Metal", self.__extract_metal),
+        )
+        self.__select_fields(fields if fields is not None else parsed_log_fields)
+
+    def __select_fields(self, fields: Collection[str]):
+        # Only the extractors of the requested fields look at the lines at all
+        self.__fields = frozenset(fields)
+        self.__extractors = tuple(
+            (needle, extractor)
+            for field, needle, extractor in self.__field_extractors
+            if field in self.__fields
+        )
+        self.__extracts_errors = "errors" in self.__fields
+        self.__extracts_timeline = "timeline" in self.__fields
+        self.__extracts_filepaths = "filepaths" in self.__fields
+        self.__extracts_last_timestamp = "last_timestamp" in self.__fields
+
+    def __skip_if_unsupported(self):
+        # Logs the analyser is going to reject only need to be checked against the blocklists
+        if self._log.is_unsupported():
+            self.__select_fields(self.__fields & blocklist_fields)
+
+    @property
+    def log(self) -> ParsedLog:
+        # Only complete once close() was called, but useful to look at while a log is still being read
+        return self._log
+
+    def tokenize(self, log_text: str) -> ParsedLog:
+        self.feed(log_text)
+        return self.close()
+
+    def tokenize_bytes(
+        self,
+        log_bytes: Union[bytes, bytearray, mmap.mmap],
+        start: int = 0,
+        chunk_size: int = 2**20,
+    ) -> ParsedLog:
+        # Decoding line-aligned chunks means only a single chunk of the log ever exists as str,
+        # a newline byte can't be part of a multibyte UTF-8 sequence so splitting after it is safe
+        with memoryview(log_bytes) as log_view:
+            while start < len(log_bytes):
+                end = log_bytes.find(b"\n", start + chunk_size) + 1
+                if end == 0:
+                    end = len(log_bytes)
+                self.feed(str(log_view[start:end], "UTF-8"))
+                start = end
+        return self.close()
+
+    def feed(self, log_text: str):
+        with measure_stage(self._timings, "tokenize"), self.__track_cpu_time():
+            self._log.size += len(log_text)
+            # Text can arrive in arbitrary chunks, so the last incomplete line is kept until the rest of it arrives
+            log_text = self.__partial_line + log_text
+            line_end = log_text.rfind("\n") + 1
+            self.__partial_line = log_text[line_end:]
+            self.__feed_lines(log_text[:line_end].splitlines())
+
+    @contextlib.contextmanager
+    def __track_cpu_time(self) -> Iterator[None]:
+        # Only the time spent in the tokenizer counts, not whatever else ran between two chunks
+        self.__cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.__cpu_time += time.thread_time() - self.__cpu_start
+            self.__cpu_start = None
+
+    def __check_cpu_budget(self):
+        if self._cpu_budget is None:
+            return
+        cpu_time = self.__cpu_time + time.thread_time() - self.__cpu_start
+        if cpu_time > self._cpu_budget:
+            raise LogTooComplexError(
+                f"Tokenizing the log took more than {self._cpu_budget}s of CPU time."
+            )
+
+    def __check_deadline(self):
+        # The analysis skips its sections past the deadline anyway, but the blocklists still need the whole log
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self._deadline = None
+            self.__select_fields(self.__fields & blocklist_fields)
+
+    def __feed_lines(self, lines: list[str]):
+        self._log.line_count += len(lines)
+        for index, line in enumerate(lines):
+            self.__feed_line(line)
+            if index % 256 == 255:
+                self.__check_cpu_budget()
+                self.__check_deadline()
+        self.__check_cpu_budget()
+        self.__check_deadline()
+
+        if not self.__extracts_last_timestamp:
+            return
+        for line in reversed(lines):
+            timestamps = timestamp_pattern.findall(line)
+            if timestamps:
+                self._log.last_timestamp = timestamps[-1]
+                break
+
+    def __feed_line(self, line: str):
+        if not self._log.has_log_entries:
+            self._log.has_log_entries = log_start_pattern.search(line) is not None
+        if self.__pending_cheat_line is not None:
+            self.__resolve_cheat(line)
+        if self.__block is not None:
+            self.__extract_block_line(line)
+
+        if self.__extracts_errors:
+            self.__extract_errors(line)
+        if self.__extracts_timeline:
+            self.__extract_timeline(line)
+        if (
+            self.__extracts_filepaths
+            and ("/" in line or "\\" in line)
+            and any(needle in line for needle in path_line_needles)
+        ):
+            self.__extract_filepaths(line)
+        for needle, extractor in self.__extractors:
+            if needle in line:
+                extractor(line)
+
+    def close(self) -> ParsedLog:
+        with (
+            measure_stage(self._timings, "tokenize", lambda: self._log.line_count),
+            self.__track_cpu_time(),
+        ):
+            self.__close()
+        return self._log
+
+    def __close(self):
+        if len(self.__partial_line) > 0:
+            self.__feed_lines(self.__partial_line.splitlines())
+            self.__partial_line = ""
+        if self.__block is not None and len(self.__block_lines) > 0:
+            self.__finish_block()
+        self.__block = None
+        if self.__pending_cheat_line is not None:
+            self.__resolve_cheat(None)
+        self.__finish_error()
+
+    def __extract_errors(self, line: str):
+        if len(line.strip()) == 0:
+            return
+        if "|E|" in line:
+            self.__finish_error()
+            self.__curr_error_lines = [line]
+            self._log.last_error = self.__curr_error_lines
+            self.__is_error_line = True
+        elif self.__is_error_line and line[0] == " ":
+            self.__curr_error_lines.append(line)
+
+    def __finish_error(self):
+        if len(self.__curr_error_lines) == 0:
+            return
+        error_lines = self.__curr_error_lines
+        self.__curr_error_lines = []
+        self._log.error_count += 1
+
+        error_text = "\n".join(error_lines)
+        signature = hashlib.sha256(
+            error_signature_pattern.sub("", error_text).encode()
+        ).hexdigest()
+        timestamp_match = log_start_pattern.search(error_lines[0])
+        timestamp = timestamp_match.group() if timestamp_match is not None else None
+        if signature in self._log.errors:
+            self._log.errors[signature].add(timestamp)
+            return
+
+        # Errors beyond the limit are only counted, but they can still be common errors
+        self._log.common_errors.update(self._rules.find_errors(error_text))
+        if len(self._log.errors) >= self._max_error_signatures:
+            self._log.dropped_error_count += 1
+            return
+        self._log.errors[signature] = ErrorSignature(signature, error_lines, timestamp)
+
+    def __extract_timeline(self, line: str):
+        # Entries start with "HH:MM:SS.mmm |L|", so the fields are read from fixed offsets instead of a regex
+        is_error = line.startswith("|E|", 13)
+        if not is_error and not line.startswith("|W|", 13):
+            return
+        try:
+            minute = int(line[0:2]) * 60 + int(line[3:5])
+        except ValueError:
+            return
+        counts = self._log.timeline.setdefault(minute, [0, 0])
+        if is_error:
+            counts[0] += 1
+            if self.__is_booted and self._log.first_error_after_boot is None:
+                self._log.first_error_after_boot = line[0:12]
+        else:
+            counts[1] += 1
+
+    def __extract_cpu(self, line: str):
+        if self._log.cpu is None:
+            cpu_match = cpu_pattern.search(line)
+            if cpu_match is not None:
+                self._log.cpu = cpu_match.group(1).rstrip()
+
+    def __extract_ram(self, line: str):
+        if self._log.ram is None:
+            ram_match = ram_pattern.search(line)
+            if ram_match is not None:
+                self._log.ram = ram_match.groups()
+
+    def __extract_os(self, line: str):
+        if self._log.os is None:
+            os_match = os_pattern.search(line)
+            if os_match is not None:
+                self._log.os = os_match.group(1).rstrip()
+
+    def __extract_gpu(self, line: str):
+        if self._log.gpu is None:
+            gpu_match = gpu_pattern.search(line)
+            if gpu_match is not None:
+                self._log.gpu = gpu_match.group(1).rstrip()
+                self.__skip_if_unsupported()
+
+    def __extract_version(self, line: str):
+        if self._log.ryu_version is None:
+            if "Ryujinx Version:" in line:
+                self._log.ryu_version = line.split()[-1].strip()
+            elif "Ryujinx Canary Version:" in line:
+                self._log.ryu_version = "c" + line.split()[-1].strip()
+            else:
+                return
+            self.__skip_if_unsupported()
+
+    def __extract_firmware(self, line: str):
+        if self._log.ryu_firmware is None:
+            self._log.ryu_firmware = line.split()[-1].strip()
+
+    def __extract_logs_enabled(self, line: str):
+        if self._log.logs_enabled is None:
+            logs_match = logs_enabled_pattern.search(line)
+            if logs_match is not None:
+                self._log.logs_enabled = logs_match.group(1).rstrip()
+
+    def __extract_setting(self, line: str):
+        setting_match = setting_change_pattern.search(line)
+        if setting_match is not None:
+            self._log.settings[setting_match.group(1)] = line.split()[-1]
+
+    def __extract_app_name(self, line: str):
+        app_matches = app_loaded_pattern.findall(line)
+        if app_matches:
+            self._log.app_name = app_matches[-1].rstrip()
+            # Only errors of the last game boot are interesting
+            self.__is_booted = True
+            self._log.first_error_after_boot = None
+
+    def __extract_build_ids_header(self, line: str):
+        header_match = build_ids_header_pattern.search(line)
+        if header_match is not None:
+            self.__block = "build_ids"
+            self.__block_app_id = header_match.group(1)
+            self.__block_lines = []
+
+    def __extract_ro_section_header(self, line: str):
+        if line.endswith("PrintRoSectionInfo: main:"):
+            self.__block = "ro_section"
+            self.__block_lines = []
+
+    def __extract_block_line(self, line: str):
+        if len(line) > 0 and line[0].isspace():
+            self.__block_lines.append(line)
+        elif len(line) == 0 and self.__block == "build_ids":
+            # Empty lines don't end the list of build ids
+            pass
+        else:
+            self.__finish_block()
+
+    def __finish_block(self):
+        match self.__block:
+            case "build_ids":
+                self._log.app_id_from_build_ids = self.__block_app_id.strip().upper()
+                self._log.build_ids = [
+                    bid.strip().upper()
+                    for bid in self.__block_lines
+                    if is_build_id_valid(bid.strip())
+                ]
+            case "ro_section":
+                self._log.main_ro_section = self.__parse_ro_section(self.__block_lines)
+        self.__block = None
+        self.__block_lines = []
+
+    @staticmethod
+    def __parse_ro_section(
+        lines: list[str],
+    ) -> Optional[dict[str, Union[str, list[str]]]]:
+        if len(lines) == 0:
+            return None
+        ro_section = {"module": "", "sdk_libraries": []}
+        for line in lines:
+            line = line.strip()
+            if line.startswith("Module:"):
+                ro_section["module"] = line[8:]
+            elif line.startswith("SDK Libraries:"):
+                ro_section["sdk_libraries"].append(line[19:])
+            elif line.startswith("SDK "):
+                ro_section["sdk_libraries"].append(line[4:])
+            else:
+                break
+        return ro_section
+
+    def __extract_filepaths(self, line: str):
+        for filepath in filepath_pattern.findall(line):
+            filepath = filepath.rstrip("\u0000").strip()
+            if len(filepath) > 0:
+                self._log.filepaths.add(filepath)
+
+    def __extract_homebrew(self, line: str):
+        # "Load" has to come first, searching after its first occurrence avoids backtracking over the line
+        load_start = line.find("Load")
+        if (
+            load_start >= 0
+            and homebrew_pattern.search(line, load_start + 4) is not None
+        ):
+            self._log.is_homebrew = True
+
+    def __extract_mods(self, line: str):
+        # Mods are listed as "Found [enabled|disabled] mod '<name>' [<type>]", names can contain quotes
+        # so a name ends at the first "' [" which is followed by a "]" somewhere later in the line
+        type_end = line.rfind("]")
+        type_starts = [
+            type_match.start()
+            for type_match in mod_type_start_pattern.finditer(line)
+            if type_match.end() < type_end
+        ]
+        position = 0
+        while (start_match := mod_start_pattern.search(line, position)) is not None:
+            name_start = start_match.end()
+            index = bisect.bisect_left(type_starts, name_start + 1)
+            if index == len(type_starts):
+                break
+            name_end = type_starts[index]
+            position = line.find("]", name_end + 4) + 1
+            self._log.mods.append(
+                (
+                    start_match.group(1) or "",
+                    line[name_start:name_end],
+                    line[name_end + 2 : position],
+                )
+            )
+
+    def __extract_cheat(self, line: str):
+        # Whether a cheat failed to compile is only known once the next line has been read
+        self.__pending_cheat_line = line
+
+    def __resolve_cheat(self, next_line: Optional[str]):
+        cheat_line = self.__pending_cheat_line
+        self.__pending_cheat_line = None
+        start_match = cheat_start_pattern.search(cheat_line)
+        if start_match is None:
+            return
+        text = cheat_line if next_line is None else f"{cheat_line}\n{next_line}"
+        # The name ends at the last quote of the line which isn't followed by a compile error
+        name_start = start_match.end()
+        name_end = cheat_line.rfind("'")
+        while name_end > name_start and failed_cheat_pattern.match(text, name_end + 1):
+            name_end = cheat_line.rfind("'", name_start, name_end)
+        if name_end > name_start:
+            self._log.cheats.append(cheat_line[name_start:name_end])
+
+    def __extract_controllers(self, line: str):
+        self._log.controllers.extend(controller_pattern.findall(line))
+
+    def __extract_user_profile(self, line: str):
+        self._log.default_user_profile = True
+
+    def __extract_metal(self, line: str):
+        self._log.using_metal = True
+
+
 class LogAnalyser:
-    _log_text: str
-    _log_errors: list[list[str]]
-    _hardware_info: dict[str, Optional[str]]
-    _emu_info: dict[str, Optional[str]]
-    _game_info: dict[str, Optional[str]]
-    _settings: dict[str, Optional[str]]
-    _notes: Union[set[str], list[str]]
+    """Analyses a parsed log, every field is only computed once it's first accessed."""
+
+    _parsed_log: ParsedLog
+    _timings: Optional[StageTimings]
+    _deadline: Optional[float]
+    _rules: LogAnalyserRules
+    skipped_sections: list[str]
+
+    @staticmethod
+    def parse(
+        log_file: Union[str, bytes, bytearray, mmap.mmap],
+        timings: Optional[StageTimings] = None,
+        rules: Optional[LogAnalyserRules] = None,
+        fields: Optional[Collection[str]] = None,
+    ) -> ParsedLog:
+        tokenizer = LogTokenizer(timings, rules=rules, fields=fields)
+        if isinstance(log_file, str):
+            return tokenizer.tokenize(log_file)
+        return tokenizer.tokenize_bytes(log_file)
 
     @staticmethod
     def is_homebrew(log_file: str) -> bool:
-        return (
-            re.search("Load.*Application: Loading as [Hh]omebrew", log_file) is not None
-        )
+        return LogAnalyser.parse(log_file, fields=("is_homebrew",)).is_homebrew
 
     @staticmethod
     def is_using_metal(log_file: str) -> bool:
-        return (
-            re.search("Gpu : Backend \\(Metal\\): Metal", log_file) is not None
-        )
+        return LogAnalyser.parse(log_file, fields=("using_metal",)).using_metal
 
     @staticmethod
     def get_filepaths(log_file: str) -> set[str]:
-        return set(
-            x.rstrip("\u0000")
-            for x in re.findall(r"(?:[A-Za-z]:)?(?:[\\/]+[^\\/:\"\r\n]+)+", log_file)
-        )
+        return LogAnalyser.parse(log_file, fields=("filepaths",)).filepaths
 
     @staticmethod
     def get_main_ro_section(log_file: str) -> Optional[dict[str, str]]:
-        ro_section_matches = re.findall(
-            r"PrintRoSectionInfo: main:[\r\n]((?:\s+.*[\r\n])*)", log_file
-        )
-        if ro_section_matches and len(ro_section_matches) > 0:
-            ro_section_match: str = ro_section_matches[-1]
-            ro_section = {"module": "", "sdk_libraries": []}
-            if ro_section_match is None or len(ro_section_match) == 0:
-                return None
-            for line in ro_section_match.splitlines():
-                line = line.strip()
-                if line.startswith("Module:"):
-                    ro_section["module"] = line[8:]
-                elif line.startswith("SDK Libraries:"):
-                    ro_section["sdk_libraries"].append(line[19:])
-                elif line.startswith("SDK "):
-                    ro_section["sdk_libraries"].append(line[4:])
-                else:
-                    break
-            return ro_section
-        return None
+        return LogAnalyser.parse(log_file, fields=("main_ro_section",)).main_ro_section
 
     @staticmethod
     def get_app_info(
         log_file: str,
     ) -> Optional[tuple[str, str, str, list[str], dict[str, str]]]:
-        game_name_match = re.findall(
-            r"Loader [A-Za-z]*: Application Loaded:\s([^;\n\r]*)",
-            log_file,
-            re.MULTILINE,
-        )
-        if game_name_match:
-            game_name = game_name_match[-1].rstrip()
-            app_id_match = re.match(r".* \[([a-zA-Z0-9]*)\]", game_name)
-            if app_id_match:
-                app_id = app_id_match.group(1).strip().upper()
-            else:
-                app_id = ""
-            bids_match_all = re.findall(
-                r"Build ids found for (?:title|application) ([a-zA-Z0-9]*):[\n\r]*((?:\s+.*[\n\r]+)+)",
-                log_file,
+        return LogAnalyser.parse(
+            log_file, fields=("app_name", "build_ids", "main_ro_section")
+        ).get_app_info()
+
+    def __init__(
+        self,
+        log_text: Union[str, list[str], bytes, bytearray, mmap.mmap, ParsedLog],
+        timings: Optional[StageTimings] = None,
+        deadline: Optional[float] = None,
+        rules: Optional[LogAnalyserRules] = None,
+    ):
+        self._timings = timings
+        # Sections which are first accessed after this time.monotonic() value are skipped
+        self._deadline = deadline
+        # A parsed log has to be analysed with the same rules it was tokenized with
+        self._rules = rules if rules is not None else default_log_analyser_rules
+        self.skipped_sections = []
+
+        if isinstance(log_text, ParsedLog):
+            self._parsed_log = log_text
+        elif isinstance(log_text, (str, list)):
+            if isinstance(log_text, list):
+                log_text = "\n".join(log_text)
+            # Large files show a header value when not downloaded completely
+            # this regex makes sure that the log text to read starts from the first timestamp, ignoring headers
+            log_file_match = log_start_pattern.search(log_text)
+            if log_file_match:
+                log_text = log_text[log_file_match.start() :]
+            self._parsed_log = self.parse(log_text, timings, self._rules)
+        elif isinstance(log_text, (bytes, bytearray, mmap.mmap)):
+            log_file_match = log_start_bytes_pattern.search(log_text)
+            self._parsed_log = LogTokenizer(timings, rules=self._rules).tokenize_bytes(
+                log_text, log_file_match.start() if log_file_match else 0
             )
-            if bids_match_all and len(bids_match_all) > 0:
-                bids_match: tuple[str] = bids_match_all[-1]
-                app_id_from_bids = None
-                build_ids = None
-                if bids_match[0] is not None:
-                    app_id_from_bids = bids_match[0].strip().upper()
-                if bids_match[1] is not None:
-                    build_ids = [
-                        bid.strip().upper()
-                        for bid in bids_match[1].splitlines()
-                        if is_build_id_valid(bid.strip())
-                    ]
-
-                return (
-                    game_name,
-                    app_id,
-                    app_id_from_bids,
-                    build_ids,
-                    LogAnalyser.get_main_ro_section(log_file),
-                )
-        return None
-
-    @staticmethod
-    def contains_errors(search_terms, errors):
-        for term in search_terms:
-            for error_lines in errors:
-                line = "\n".join(error_lines)
-                if term in line:
-                    return True
-        return False
-
-    def __init__(self, log_text: Union[str, list[str]]):
-        self.__init_members()
-
-        if isinstance(log_text, str):
-            self._log_text = log_text.replace("\r\n", "\n")
-        elif isinstance(log_text, list):
-            self._log_text = "\n".join(log_text)
         else:
             raise TypeError(log_text)
 
-        # Large files show a header value when not downloaded completely
-        # this regex makes sure that the log text to read starts from the first timestamp, ignoring headers
-        log_file_header_regex = re.compile(r"\d{2}:\d{2}:\d{2}\.\d{3}.*", re.DOTALL)
-        log_file_match = re.search(log_file_header_regex, self._log_text)
-        if log_file_match and log_file_match.group(0) is not None:
-            self._log_text = log_file_match.group(0)
-        else:
+        if not self._parsed_log.has_log_entries:
             raise ValueError("No log entries found.")
+        if timings is not None:
+            timings.input_size = self._parsed_log.size
 
-        self.__get_errors()
-        self.__get_hardware_info()
-        self.__get_settings_info()
-        self.__get_ryujinx_info()
-        self.__get_app_name()
-        self.__get_mods()
-        self.__get_cheats()
-        self.__get_notes()
-
-    def __init_members(self):
-        self._hardware_info = {
+    def __is_past_deadline(self, section: str) -> bool:
+        if self._deadline is None or time.monotonic() < self._deadline:
+            return False
+        self.skipped_sections.append(section)
+        return True
+
+    @staticmethod
+    def __count_known(info: dict[str, Optional[str]]) -> int:
+        return sum(1 for value in info.values() if value not in (None, "Unknown"))
+
+    @functools.cached_property
+    def _log_errors(self) -> list[ErrorSignature]:
+        with measure_stage(
+            self._timings, "get_errors", lambda: len(self._parsed_log.errors)
+        ):
+            return list(self._parsed_log.errors.values())
+
+    @functools.cached_property
+    def _hardware_info(self) -> dict[str, Optional[str]]:
+        hardware_info = {
             "cpu": "Unknown",
             "gpu": "Unknown",
             "ram": "Unknown",
             "os": "Unknown",
         }
-        self._emu_info = {
+        if self.__is_past_deadline("hardware info"):
+            return hardware_info
+        with measure_stage(
+            self._timings,
+            "get_hardware_info",
+            lambda: self.__count_known(hardware_info),
+        ):
+            self.__get_hardware_info(hardware_info)
+        return hardware_info
+
+    @functools.cached_property
+    def _emu_info(self) -> dict[str, Optional[str]]:
+        emu_info = {
             "ryu_version": "Unknown",
             "ryu_firmware": "Unknown",
             "logs_enabled": None,
         }
-        self._game_info = {
-            "game_name": "Unknown",
-            "errors": "No errors found in log",
-            "mods": "No mods found",
-            "cheats": "No cheats found",
-        }
-        self._settings = {
+        if self.__is_past_deadline("Ryujinx info"):
+            return emu_info
+        with measure_stage(
+            self._timings, "get_ryujinx_info", lambda: self.__count_known(emu_info)
+        ):
+            self.__get_ryujinx_info(emu_info)
+        return emu_info
+
+    @functools.cached_property
+    def _settings(self) -> dict[str, Optional[str]]:
+        settings = {
             "audio_backend": "Unknown",
             "backend_threading": "Unknown",
             "docked": "Unknown",
@@ -204,127 +950,127 @@ class LogAnalyser:
             "aspect_ratio": "Unknown",
             "texture_recompression": "Unknown",
         }
-        self._notes = set()
-        self._log_errors = []
-
-    def __get_errors(self):
-        errors = []
-        curr_error_lines = []
-        error_line = False
-        for line in self._log_text.splitlines():
-            if len(line.strip()) == 0:
-                continue
-            if "|E|" in line:
-                curr_error_lines = [line]
-                errors.append(curr_error_lines)
-                error_line = True
-            elif error_line and line[0] == " ":
-                curr_error_lines.append(line)
-        if len(curr_error_lines) > 0:
-            errors.append(curr_error_lines)
-
-        self._log_errors = errors
-
-    def __get_hardware_info(self):
-        for setting in self._hardware_info.keys():
+        if self.__is_past_deadline("settings"):
+            return settings
+        with measure_stage(
+            self._timings,
+            "get_settings_info",
+            lambda: len(self._parsed_log.settings),
+        ):
+            self.__get_settings_info(settings)
+        return settings
+
+    @functools.cached_property
+    def _game_info(self) -> dict[str, Optional[str]]:
+        game_info = {
+            "game_name": "Unknown",
+            "errors": "No errors found in log",
+            "mods": "No mods found",
+            "cheats": "No cheats found",
+        }
+        if not self.__is_past_deadline("game name"):
+            with measure_stage(
+                self._timings,
+                "get_app_name",
+                lambda: int(self._parsed_log.app_name is not None),
+            ):
+                self.__get_app_name(game_info)
+        if not self.__is_past_deadline("mods"):
+            with measure_stage(
+                self._timings, "get_mods", lambda: len(self._parsed_log.mods)
+            ):
+                self.__get_mods(game_info)
+        if not self.__is_past_deadline("cheats"):
+            with measure_stage(
+                self._timings, "get_cheats", lambda: len(self._parsed_log.cheats)
+            ):
+                self.__get_cheats(game_info)
+        return game_info
+
+    @functools.cached_property
+    def _notes(self) -> Union[set[str], list[str]]:
+        notes = set()
+        if self.__is_past_deadline("notes"):
+            return notes
+        with measure_stage(self._timings, "get_notes", lambda: len(notes)):
+            for detector in note_detectors:
+                self.__run_note_detector(detector, notes)
+        return notes
+
+    def __run_note_detector(self, detector: NoteDetector, notes: set[str]):
+        # Fields are computed before the detector is measured, so it's only charged for its own work
+        for field in detector.depends_on:
+            getattr(self, field)
+        notes_count = len(notes)
+        with measure_stage(
+            self._timings, f"note.{detector.name}", lambda: len(notes) - notes_count
+        ):
+            detector.detect(self, notes)
+
+    def __get_hardware_info(self, hardware_info: dict[str, Optional[str]]):
+        for setting in hardware_info.keys():
             match setting:
                 case "cpu":
-                    cpu_match = re.search(
-                        r"CPU:\s([^;\n\r]*)", self._log_text, re.MULTILINE
-                    )
-                    if cpu_match is not None and cpu_match.group(1) is not None:
-                        self._hardware_info[setting] = cpu_match.group(1).rstrip()
+                    if self._parsed_log.cpu is not None:
+                        hardware_info[setting] = self._parsed_log.cpu
 
                 case "ram":
-                    sizes = "|".join(Size.names())
-                    ram_match = re.search(
-                        rf"RAM: Total ([\d.]+) ({sizes}) ; Available ([\d.]+) ({sizes})",
-                        self._log_text,
-                        re.MULTILINE,
-                    )
-                    if ram_match is not None:
+                    if self._parsed_log.ram is not None:
+                        total, total_unit, available, available_unit = (
+                            self._parsed_log.ram
+                        )
                         try:
                             dest_unit = Size.MiB
 
-                            ram_available = float(ram_match.group(3))
-                            ram_available = Size.from_name(ram_match.group(4)).convert(
+                            ram_available = float(available)
+                            ram_available = Size.from_name(available_unit).convert(
                                 ram_available, dest_unit
                             )
 
-                            ram_total = float(ram_match.group(1))
-                            ram_total = Size.from_name(ram_match.group(2)).convert(
+                            ram_total = float(total)
+                            ram_total = Size.from_name(total_unit).convert(
                                 ram_total, dest_unit
                             )
 
-                            self._hardware_info[setting] = (
+                            hardware_info[setting] = (
                                 f"{ram_available:.0f}/{ram_total:.0f} {dest_unit.name}"
                             )
                         except ValueError:
-                            # ram_match.group(1) or ram_match.group(3) couldn't be parsed as a float.
-                            self._hardware_info[setting] = "Error"
+                            # total or available couldn't be parsed as a float.
+                            hardware_info[setting] = "Error"
 
                 case "os":
-                    os_match = re.search(
-                        r"Operating System:\s([^;\n\r]*)",
-                        self._log_text,
-                        re.MULTILINE,
-                    )
-                    if os_match is not None and os_match.group(1) is not None:
-                        self._hardware_info[setting] = os_match.group(1).rstrip()
+                    if self._parsed_log.os is not None:
+                        hardware_info[setting] = self._parsed_log.os
 
                 case "gpu":
-                    gpu_match = re.search(
-                        r"PrintGpuInformation:\s([^;\n\r]*)",
-                        self._log_text,
-                        re.MULTILINE,
-                    )
-                    if gpu_match is not None and gpu_match.group(1) is not None:
-                        gpu = gpu_match.group(1).rstrip()
-
-                        if "Mali" in gpu:
-                            raise LogDataError("Android is not supported.")
-
-                        self._hardware_info[setting] = gpu
+                    if self._parsed_log.gpu is not None:
+                        hardware_info[setting] = self._parsed_log.gpu
 
                 case _:
                     raise NotImplementedError(setting)
 
-    def __get_ryujinx_info(self):
-        for setting in self._emu_info.keys():
+    def __get_ryujinx_info(self, emu_info: dict[str, Optional[str]]):
+        for setting in emu_info.keys():
             match setting:
                 case "ryu_version":
-                    for line in self._log_text.splitlines():
-                        if "Ryujinx Version:" in line:
-                            self._emu_info[setting] = line.split()[-1].strip()
-                            break
-                        if "Ryujinx Canary Version:" in line:
-                            self._emu_info[setting] = "c" + line.split()[-1].strip()
-                            break
+                    if self._parsed_log.ryu_version is not None:
+                        emu_info[setting] = self._parsed_log.ryu_version
 
                 case "logs_enabled":
-                    logs_match = re.search(
-                        r"Logs Enabled:\s([^;\n\r]*)", self._log_text, re.MULTILINE
-                    )
-                    if logs_match is not None and logs_match.group(1) is not None:
-                        self._emu_info[setting] = logs_match.group(1).rstrip()
+                    if self._parsed_log.logs_enabled is not None:
+                        emu_info[setting] = self._parsed_log.logs_enabled
 
                 case "ryu_firmware":
-                    for line in self._log_text.splitlines():
-                        if "Firmware Version:" in line:
-                            self._emu_info[setting] = line.split()[-1].strip()
-                            break
+                    if self._parsed_log.ryu_firmware is not None:
+                        emu_info[setting] = self._parsed_log.ryu_firmware
 
                 case _:
                     raise NotImplementedError(setting)
 
     def __get_setting_value(self, name, key):
-        values = [
-            line.split()[-1]
-            for line in self._log_text.splitlines()
-            if re.search(rf"LogValueChange: ({key})\s", line)
-        ]
-        if len(values) > 0:
-            value = values[-1]
+        if key in self._parsed_log.settings:
+            value = self._parsed_log.settings[key]
         elif name == "vsync":
             return "Enabled"
         elif name == "texture_recompression":
@@ -391,7 +1137,7 @@ class LogAnalyser:
             case _:
                 return value
 
-    def __get_settings_info(self):
+    def __get_settings_info(self, settings: dict[str, Optional[str]]):
         settings_map = {
             "anisotropic_filtering": "MaxAnisotropy",
             "aspect_ratio": "AspectRatio",
@@ -411,17 +1157,14 @@ class LogAnalyser:
             "hypervisor": "UseHypervisor",
         }
 
-        for key in self._settings.keys():
+        for key in settings.keys():
             if key in settings_map:
-                self._settings[key] = self.__get_setting_value(key, settings_map[key])
+                settings[key] = self.__get_setting_value(key, settings_map[key])
             else:
                 raise NotImplementedError(key)
 
-    def __get_mods(self):
-        mods_regex = re.compile(
-            r"Found\s(enabled|disabled)?\s?mod\s\'(.+?)\'\s(\[.+?\])"
-        )
-        matches = re.findall(mods_regex, self._log_text)
+    def __get_mods(self, game_info: dict[str, Optional[str]]):
+        matches = self._parsed_log.mods
         if matches:
             mods = [
                 {"mod": match[1], "status": match[0], "type": match[2]}
@@ -435,63 +1178,20 @@ class LogAnalyser:
             # Remove duplicated mods from output
             mods_status = list(dict.fromkeys(mods_status))
 
-            self._game_info["mods"] = "\n".join(mods_status)
+            game_info["mods"] = "\n".join(mods_status)
 
-    def __get_cheats(self):
-        # Make sure to skip cheats which fail to compile
-        cheat_regex = re.compile(
-            r"Installing cheat\s'(.+)'(?!\s\d{2}:\d{2}:\d{2}\.\d{3}\s\|E\|\sTamperMachine\sCompile)"
-        )
-        matches = re.findall(cheat_regex, self._log_text)
+    def __get_cheats(self, game_info: dict[str, Optional[str]]):
+        matches = self._parsed_log.cheats
         if matches:
             cheats = [f"ℹ️ {match}" for match in matches]
 
-            self._game_info["cheats"] = "\n".join(cheats)
-
-    def __get_app_name(self):
-        app_match = re.findall(
-            r"Loader [A-Za-z]*: Application Loaded:\s([^;\n\r]*)",
-            self._log_text,
-            re.MULTILINE,
-        )
-        if app_match:
-            self._game_info["game_name"] = app_match[-1].rstrip()
-
-    def __get_controller_notes(self):
-        controllers_regex = re.compile(r"Hid Configure: ([^\r\n]+)")
-        controllers = re.findall(controllers_regex, self._log_text)
-        if controllers:
-            input_status = [f"ℹ {match}" for match in controllers]
-            # Hid Configure lines can appear multiple times, so converting to dict keys removes duplicate entries,
-            # also maintains the list order
-            input_status = list(dict.fromkeys(input_status))
-            self._notes.add("\n".join(input_status))
-        # If emulator crashes on startup without game load, there is no need to show controller notification at all
-        elif self._game_info["game_name"] != "Unknown":
-            self._notes.add("⚠️ No controller information found.")
-
-    def __get_os_notes(self):
-        if (
-            "Windows" in self._hardware_info["os"]
-            and self._settings["graphics_backend"] != "Vulkan"
-        ):
-            if "Intel" in self._hardware_info["gpu"]:
-                self._notes.add(
-                    "**⚠️ Intel iGPU users should consider using Vulkan graphics backend.**"
-                )
-            if "AMD" in self._hardware_info["gpu"]:
-                self._notes.add(
-                    "**⚠️ AMD GPU users should consider using Vulkan graphics backend.**"
-                )
-
-        if "macOS" in self._hardware_info["os"] and "Intel" in self._hardware_info["cpu"]:
-            self._notes.add("**⚠️ Intel Macs are not supported.**")
+            game_info["cheats"] = "\n".join(cheats)
 
-    def __get_cpu_notes(self):
-        if "VirtualApple" in self._hardware_info["cpu"]:
-            self._notes.add("🔴 **Rosetta should be disabled.**")
+    def __get_app_name(self, game_info: dict[str, Optional[str]]):
+        if self._parsed_log.app_name is not None:
+            game_info["game_name"] = self._parsed_log.app_name
 
-    def __get_log_notes(self):
+    def __get_log_notes(self, notes: set[str]):
         default_logs = ["Info", "Warning", "Error", "Guest"]
         user_logs = []
         if self._emu_info["logs_enabled"] is not None:
@@ -500,7 +1200,7 @@ class LogAnalyser:
             )
 
         if "Debug" in user_logs:
-            self._notes.add(
+            notes.add(
                 "⚠️ **Debug logs enabled will have a negative impact on performance.**"
             )
 
@@ -511,49 +1211,7 @@ class LogAnalyser:
         else:
             log_string = "✅ Default logs enabled"
 
-        self._notes.add(log_string)
-
-    def __get_settings_notes(self):
-        if self._settings["audio_backend"] == "Dummy":
-            self._notes.add(
-                "⚠️ Dummy audio backend, consider changing to SDL2 or OpenAL."
-            )
-
-        if self._settings["pptc"] == "Disabled":
-            self._notes.add("🔴 **PPTC cache should be enabled.**")
-
-        if self._settings["shader_cache"] == "Disabled":
-            self._notes.add("🔴 **Shader cache should be enabled.**")
-
-        if (self._settings["expand_ram"] is not None) and "4K" not in self._game_info["mods"]:
-            self._notes.add(
-                "⚠️ `DRAM size` should only be increased for 4K mods."
-            )
-
-        if self._settings["memory_manager"] == "SoftwarePageTable":
-            self._notes.add(
-                "🔴 **`Software` setting in Memory Manager Mode will give slower performance than the default setting of `Host unchecked`.**"
-            )
-
-        if self._settings["ignore_missing_services"] == "True":
-            self._notes.add(
-                "⚠️ `Ignore Missing Services` being enabled can cause instability."
-            )
-
-        if self._settings["vsync"] == "Unbounded":
-            self._notes.add(
-                "⚠️ V-Sync disabled can cause instability like games running faster than intended or longer load times."
-            )
-
-        if self._settings["fs_integrity"] == "Disabled":
-            self._notes.add(
-                "⚠️ Disabling file integrity checks may cause corrupted dumps to not be detected."
-            )
-
-        if self._settings["backend_threading"] == "Off":
-            self._notes.add(
-                "🔴 **Graphics Backend Multithreading should be set to `Auto`.**"
-            )
+        notes.add(log_string)
 
     def __sort_notes(self):
         def severity(log_note_string):
@@ -567,91 +1225,135 @@ class LogAnalyser:
         # Severity key then orders alphabetically sorted warnings to show most severe first
         return sorted(sorted(game_notes, key=lambda x: x.split()[1]), key=severity)
 
-    def __get_notes(self):
-        for common_error in self.get_common_errors():
-            match common_error:
-                case CommonError.SHADER_CACHE_COLLISION:
-                    self._notes.add(
-                        "⚠️ Cache collision detected. Investigate possible shader cache issues."
-                    )
-                case CommonError.SHADER_CACHE_CORRUPTION:
-                    self._notes.add(
-                        "⚠️ Cache corruption detected. Investigate possible shader cache issues."
-                    )
-                case CommonError.DUMP_HASH:
-                    self._notes.add(
-                        "⚠️ Dump error detected. Redump your game, game update and DLC."
-                    )
-                case CommonError.UPDATE_KEYS:
-                    self._notes.add(
-                        "⚠️ Keys or firmware out of date, consider redumping them."
-                    )
-                case CommonError.FILE_PERMISSIONS:
-                    self._notes.add(
-                        "⚠️ File permission error. Consider deleting save directory and allowing Ryujinx to make a new one."
-                    )
-                case CommonError.FILE_NOT_FOUND:
-                    self._notes.add(
-                        "⚠️ Save not found error. Consider starting game without a save file or using a new save file."
-                    )
-                case CommonError.MISSING_SERVICES:
-                    if self._settings["ignore_missing_services"] == "False":
-                        self._notes.add(
-                            "⚠️ Consider enabling `Ignore Missing Services` in Ryujinx settings."
-                        )
-                case CommonError.VULKAN_OUT_OF_MEMORY:
-                    if self._settings["texture_recompression"] == "Disabled":
-                        self._notes.add(
-                            "⚠️ Consider enabling `Texture Recompression` in Ryujinx settings."
-                        )
-                case _:
-                    raise NotImplementedError(common_error)
+    @note_detector("common_errors", depends_on=("_settings",))
+    def __get_common_error_notes(self, notes: set[str]):
+        notes.update(
+            self._rules.get_error_notes(self.get_common_errors(), self._settings)
+        )
 
-        timestamp_regex = re.compile(r"(\d{2}:\d{2}:\d{2}\.\d{3})\s+?\|")
-        latest_timestamp = re.findall(timestamp_regex, self._log_text)[-1]
+    @note_detector("time_elapsed")
+    def __get_time_elapsed_notes(self, notes: set[str]):
+        latest_timestamp = self._parsed_log.last_timestamp
         if latest_timestamp:
             timestamp_message = f"ℹ️ Time elapsed: `{latest_timestamp}`"
-            self._notes.add(timestamp_message)
+            notes.add(timestamp_message)
 
+    @note_detector("user_profile")
+    def __get_user_profile_notes(self, notes: set[str]):
         if self.is_default_user_profile():
-            self._notes.add(
-                "⚠️ Default user profile in use, consider creating a custom one."
-            )
+            notes.add("⚠️ Default user profile in use, consider creating a custom one.")
+
+    @note_detector("controllers", depends_on=("_game_info",))
+    def __get_controller_notes(self, notes: set[str]):
+        controllers = self._parsed_log.controllers
+        if controllers:
+            input_status = [f"ℹ {match}" for match in controllers]
+            # Hid Configure lines can appear multiple times, so converting to dict keys removes duplicate entries,
+            # also maintains the list order
+            input_status = list(dict.fromkeys(input_status))
+            notes.add("\n".join(input_status))
+        # If emulator crashes on startup without game load, there is no need to show controller notification at all
+        elif self._game_info["game_name"] != "Unknown":
+            notes.add("⚠️ No controller information found.")
+
+    @note_detector("os", depends_on=("_hardware_info", "_settings"))
+    def __get_os_notes(self, notes: set[str]):
+        if (
+            "Windows" in self._hardware_info["os"]
+            and self._settings["graphics_backend"] != "Vulkan"
+        ):
+            if "Intel" in self._hardware_info["gpu"]:
+                notes.add(
+                    "**⚠️ Intel iGPU users should consider using Vulkan graphics backend.**"
+                )
+            if "AMD" in self._hardware_info["gpu"]:
+                notes.add(
+                    "**⚠️ AMD GPU users should consider using Vulkan graphics backend.**"
+                )
 
-        self.__get_controller_notes()
-        self.__get_os_notes()
-        self.__get_cpu_notes()
+        if (
+            "macOS" in self._hardware_info["os"]
+            and "Intel" in self._hardware_info["cpu"]
+        ):
+            notes.add("**⚠️ Intel Macs are not supported.**")
 
+    @note_detector("cpu", depends_on=("_hardware_info",))
+    def __get_cpu_notes(self, notes: set[str]):
+        if "VirtualApple" in self._hardware_info["cpu"]:
+            notes.add("🔴 **Rosetta should be disabled.**")
+
+    @note_detector("firmware", depends_on=("_emu_info", "_game_info"))
+    def __get_firmware_notes(self, notes: set[str]):
         if (
             self._emu_info["ryu_firmware"] == "Unknown"
             and self._game_info["game_name"] != "Unknown"
         ):
             firmware_warning = f"**❌ Nintendo Switch firmware not found**, consider adding your keys and firmware."
-            self._notes.add(firmware_warning)
-
-        self.__get_settings_notes()
-
-        if LogAnalyser.is_using_metal(self._log_text):
-            self._notes.add("**⚠️ The Metal backend is experimental. If you're experiencing issues, switch to Vulkan or Auto.**")
+            notes.add(firmware_warning)
+
+    @note_detector("settings", depends_on=("_settings", "_game_info"))
+    def __get_settings_notes(self, notes: set[str]):
+        notes.update(self._rules.get_setting_notes(self._settings))
+
+        if (self._settings["expand_ram"] is not None) and "4K" not in self._game_info[
+            "mods"
+        ]:
+            notes.add("⚠️ `DRAM size` should only be increased for 4K mods.")
+
+    @note_detector("metal")
+    def __get_metal_notes(self, notes: set[str]):
+        if self._parsed_log.using_metal:
+            notes.add(
+                "**⚠️ The Metal backend is experimental. If you're experiencing issues, switch to Vulkan or Auto.**"
+            )
 
+    @note_detector("version", depends_on=("_emu_info",))
+    def __get_version_notes(self, notes: set[str]):
         version_type = self.get_ryujinx_version()[0]
 
         if version_type == RyujinxVersion.CUSTOM:
-            self._notes.add("**⚠️ Custom builds are not officially supported**")
-        elif version_type == RyujinxVersion.ORIGINAL_PROJECT_LDN:
-            raise LogDataError("**The old Ryujinx LDN build no longer works. Please update to [this version](<https://github.com/GreemDev/Ryujinx/releases/latest>). *Yes, it has LDN functionality.***")
+            notes.add("**⚠️ Custom builds are not officially supported**")
+
+    def __check_supported(self):
+        # Unsupported logs are always rejected, even when their sections are skipped because of the deadline
+        if self._parsed_log.gpu is not None and "Mali" in self._parsed_log.gpu:
+            raise LogDataError("Android is not supported.")
+
+        version_type = self._parsed_log.get_ryujinx_version()[0]
+        if version_type == RyujinxVersion.ORIGINAL_PROJECT_LDN:
+            raise LogDataError(
+                "**The old Ryujinx LDN build no longer works. Please update to [this version](<https://github.com/GreemDev/Ryujinx/releases/latest>). *Yes, it has LDN functionality.***"
+            )
         elif version_type == RyujinxVersion.ORIGINAL_PROJECT:
-            raise LogDataError("**⚠️ It seems you're still using the original Ryujinx. Please update to [this version](<https://github.com/GreemDev/Ryujinx/releases/latest>), as that's what this Discord server is for.**")
+            raise LogDataError(
+                "**⚠️ It seems you're still using the original Ryujinx. Please update to [this version](<https://github.com/GreemDev/Ryujinx/releases/latest>), as that's what this Discord server is for.**"
+            )
         elif version_type == RyujinxVersion.MIRROR:
-            raise LogDataError("**It seems you're using the other Ryujinx fork, ryujinx-mirror. Please update to [this version](<https://github.com/GreemDev/Ryujinx/releases/latest>), as that's what this Discord server is for; or go to their Discord server for support.**")
+            raise LogDataError(
+                "**It seems you're using the other Ryujinx fork, ryujinx-mirror. Please update to [this version](<https://github.com/GreemDev/Ryujinx/releases/latest>), as that's what this Discord server is for; or go to their Discord server for support.**"
+            )
+
+    def get_timeline(self) -> dict[str, Any]:
+        return {
+            "time_elapsed": self._parsed_log.last_timestamp,
+            "first_error_after_boot": self._parsed_log.first_error_after_boot,
+            "minutes": [
+                {"minute": minute, "errors": errors, "warnings": warnings}
+                for minute, (errors, warnings) in sorted(
+                    self._parsed_log.timeline.items()
+                )
+            ],
+        }
 
     def get_ryujinx_version(self) -> tuple[RyujinxVersion, str]:
-        version_data = self._emu_info["ryu_version"]
+        return self.parse_ryujinx_version(self._emu_info["ryu_version"])
 
+    @staticmethod
+    def parse_ryujinx_version(version_data: str) -> tuple[RyujinxVersion, str]:
         if re.match(mainline_version_pattern, version_data):
             return RyujinxVersion.STABLE, version_data
         elif re.match(canary_version_pattern, version_data):
-            return RyujinxVersion.CANARY, version_data.lstrip('c')
+            return RyujinxVersion.CANARY, version_data.lstrip("c")
         if re.match(original_project_version_pattern, version_data):
             return RyujinxVersion.ORIGINAL_PROJECT, version_data
         elif re.match(pr_version_pattern, version_data):
@@ -664,52 +1366,26 @@ class LogAnalyser:
             return RyujinxVersion.CUSTOM, version_data
 
     def is_default_user_profile(self) -> bool:
-        return (
-            re.search(r"UserId: 00000000000000010000000000000000", self._log_text)
-            is not None
-        )
+        return self._parsed_log.default_user_profile
 
     def get_last_error(self) -> Optional[list[str]]:
-        return self._log_errors[-1] if len(self._log_errors) > 0 else None
-
-    def get_common_errors(self) -> list[CommonError]:
-        errors = []
-
-        if self.contains_errors(["Cache collision found"], self._log_errors):
-            errors.append(CommonError.SHADER_CACHE_COLLISION)
-        if self.contains_errors(
-            [
-                "ResultFsInvalidIvfcHash",
-                "ResultFsNonRealDataVerificationFailed",
-            ],
-            self._log_errors,
-        ):
-            errors.append(CommonError.DUMP_HASH)
-        if self.contains_errors(
-            [
-                "Ryujinx.Graphics.Gpu.Shader.ShaderCache.Initialize()",
-                "System.IO.InvalidDataException: End of Central Directory record could not be found",
-                "ICSharpCode.SharpZipLib.Zip.ZipException: Cannot find central directory",
-            ],
-            self._log_errors,
-        ):
-            errors.append(CommonError.SHADER_CACHE_CORRUPTION)
-        if self.contains_errors(["MissingKeyException"], self._log_errors):
-            errors.append(CommonError.UPDATE_KEYS)
-        if self.contains_errors(["ResultFsPermissionDenied"], self._log_errors):
-            errors.append(CommonError.FILE_PERMISSIONS)
-        if self.contains_errors(["ResultFsTargetNotFound"], self._log_errors):
-            errors.append(CommonError.FILE_NOT_FOUND)
-        if self.contains_errors(["ServiceNotImplementedException"], self._log_errors):
-            errors.append(CommonError.MISSING_SERVICES)
-        if self.contains_errors(["ErrorOutOfDeviceMemory"], self._log_errors):
-            errors.append(CommonError.VULKAN_OUT_OF_MEMORY)
-
-        return errors
+        return self._parsed_log.last_error
+
+    def get_common_errors(self) -> list[str]:
+        # Every distinct error was already matched against the error rules while tokenizing
+        return [
+            rule["id"]
+            for rule in self._rules.error_rules
+            if rule["id"] in self._parsed_log.common_errors
+        ]
 
     def analyse_discord(
         self, is_channel_allowed: bool, pr_channel: int
     ) -> dict[str, dict[str, str]]:
+        self.__check_supported()
+        # The notes need to see all mods, so they're collected before the list is shortened below
+        notes = self._notes
+
         last_error = self.get_last_error()
         if last_error is not None:
             last_error = "\n".join(last_error[:2])
@@ -730,7 +1406,7 @@ class LogAnalyser:
             self._game_info["cheats"] = "\n".join(limit_cheats)
 
         if is_channel_allowed and self.get_ryujinx_version()[0] == RyujinxVersion.PR:
-            self._notes.add(
+            notes.add(
                 f"**⚠️ PR build logs should be posted in <#{pr_channel}> if reporting bugs or tests**"
             )
 
@@ -740,14 +1416,18 @@ class LogAnalyser:
             "\n".join(self._notes) if len(self._notes) > 0 else "Nothing to note"
         )
 
-        return {
+        result = {
             "hardware_info": self._hardware_info,
             "emu_info": self._emu_info,
             "game_info": full_game_info,
             "settings": self._settings,
         }
+        if self._deadline is not None:
+            result["skipped_sections"] = self.skipped_sections
+        return result
 
     def analyse(self) -> dict[str, Union[dict[str, str], list[str], list[list[str]]]]:
+        self.__check_supported()
         self._notes = list(self.__sort_notes())
 
         last_error = self.get_last_error()
@@ -757,36 +1437,185 @@ class LogAnalyser:
         else:
             self._game_info["errors"] = "No errors found in log"
 
-        return {
+        result = {
             "hardware_info": self._hardware_info,
             "emu_info": self._emu_info,
             "game_info": self._game_info,
             "notes": self._notes,
-            "errors": self._log_errors,
+            "errors": [error.to_dict() for error in self._log_errors],
+            "error_count": self._parsed_log.error_count,
             "settings": self._settings,
-            "app_info": self.get_app_info(self._log_text),
-            "paths": list(self.get_filepaths(self._log_text)),
+            "app_info": self._parsed_log.get_app_info(),
+            "paths": list(self._parsed_log.filepaths),
+            "timeline": self.get_timeline(),
         }
+        if self._deadline is not None:
+            result["skipped_sections"] = self.skipped_sections
+        if self._timings is not None:
+            result["timings"] = self._timings.to_dict()
+        return result
+
+
+def find_log_files(paths: list[str], pattern: str = "*.log") -> list[str]:
+    log_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            log_files.extend(
+                sorted(glob.glob(os.path.join(path, "**", pattern), recursive=True))
+            )
+        elif glob.has_magic(path):
+            log_files.extend(sorted(glob.glob(path, recursive=True)))
+        else:
+            log_files.append(path)
+    return log_files
+
+
+@contextlib.contextmanager
+def open_log_file(path: str, ranged: bool = False) -> Iterator[Union[bytes, mmap.mmap]]:
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            # Empty files can't be mapped
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as log_map:
+            if ranged and len(log_map) > 66001:
+                # Same ranges the bot downloads, so only the pages at the start and the end are read,
+                # both are cut where they can't split a UTF-8 encoded character in half
+                head_end = log_map.rfind(b"\n", 0, 60001) + 1
+                if head_end == 0:
+                    head_end = 60001
+                    while head_end > 0 and log_map[head_end] in utf8_continuation_bytes:
+                        head_end -= 1
+                yield log_map[:head_end] + b"\n" + log_map[-6000:].lstrip(
+                    utf8_continuation_bytes
+                )
+            else:
+                yield log_map
+
+
+def analyse_log_file(
+    path: str,
+    ranged: bool = False,
+    profile: bool = False,
+    rules: Optional[LogAnalyserRules] = None,
+) -> dict[str, Any]:
+    # Runs inside the batch workers, so nothing raised here may abort the whole run
+    start_time = time.perf_counter()
+    result = {"path": path, "size": 0}
+    try:
+        result["size"] = os.path.getsize(path)
+        with open_log_file(path, ranged) as log_bytes:
+            result["result"] = LogAnalyser(
+                log_bytes, StageTimings() if profile else None, rules=rules
+            ).analyse()
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+    result["seconds"] = time.perf_counter() - start_time
+    return result
 
 
 if __name__ == "__main__":
     import argparse
     import json
-    import os
+    import multiprocessing
+    import sys
 
     parser = argparse.ArgumentParser()
-    parser.add_argument("log_file", type=str)
+    parser.add_argument(
+        "log_files",
+        type=str,
+        nargs="+",
+        help="log files, directories or glob patterns; "
+        "more than a single file switches to batch mode",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes used in batch mode",
+    )
+    parser.add_argument(
+        "--pattern",
+        type=str,
+        default="*.log",
+        help="file name pattern used when searching directories",
+    )
+    parser.add_argument(
+        "--ranged",
+        action="store_true",
+        help="only analyse the first 60 KB and the last 6 KB of each log like the bot does",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="add the time spent in every analysis stage to the output",
+    )
+    parser.add_argument(
+        "--rules",
+        type=str,
+        help="JSON file with additional analyser rules, like <state_dir>/data/log_analyser_rules.json",
+    )
 
     args = parser.parse_args()
 
-    if not os.path.isfile(args.log_file):
-        print(f"Couldn't find log file: {args.log_file}")
-        exit(1)
+    rules = None
+    if args.rules is not None:
+        with open(args.rules, "r") as file:
+            rules = LogAnalyserRules(json.load(file))
+
+    if (
+        len(args.log_files) == 1
+        and not os.path.isdir(args.log_files[0])
+        and not glob.has_magic(args.log_files[0])
+    ):
+        if not os.path.isfile(args.log_files[0]):
+            print(f"Couldn't find log file: {args.log_files[0]}")
+            exit(1)
+
+        with open_log_file(args.log_files[0], args.ranged) as log_bytes:
+            analyser = LogAnalyser(
+                log_bytes, StageTimings() if args.timings else None, rules=rules
+            )
+        result = analyser.analyse()
 
-    with open(args.log_file, "r") as file:
-        text = file.read()
+        print(json.dumps(result, indent=2))
+        exit(0)
 
-    analyser = LogAnalyser(text)
-    result = analyser.analyse()
+    log_files = find_log_files(args.log_files, args.pattern)
+    if len(log_files) == 0:
+        print("Couldn't find any log files.", file=sys.stderr)
+        exit(1)
 
-    print(json.dumps(result, indent=2))
+    latencies = []
+    total_bytes = 0
+    failed = 0
+    start_time = time.perf_counter()
+    with multiprocessing.Pool(max(1, args.jobs)) as pool:
+        # Results are written as soon as they're done, so one slow log doesn't hold up the rest
+        for file_result in pool.imap_unordered(
+            functools.partial(
+                analyse_log_file,
+                ranged=args.ranged,
+                profile=args.timings,
+                rules=rules,
+            ),
+            log_files,
+            chunksize=max(1, min(16, len(log_files) // (max(1, args.jobs) * 4))),
+        ):
+            latencies.append(file_result["seconds"])
+            total_bytes += file_result["size"]
+            if "error" in file_result:
+                failed += 1
+            print(json.dumps(file_result), flush=True)
+    elapsed_time = time.perf_counter() - start_time
+
+    latencies.sort()
+    print(
+        f"Analysed {len(log_files)} files ({failed} failed) in {elapsed_time:.2f}s: "
+        f"{len(log_files) / elapsed_time:.1f} files/s, "
+        f"{total_bytes / 1_000_000 / elapsed_time:.2f} MB/s, "
+        f"p50 {latencies[int(0.5 * (len(latencies) - 1))] * 1000:.1f}ms, "
+        f"p95 {latencies[int(0.95 * (len(latencies) - 1))] * 1000:.1f}ms",
+        file=sys.stderr,
+    )